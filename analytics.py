@@ -0,0 +1,218 @@
+"""Columnar in-memory attendance for analytics.
+
+:class:`AttendanceFrame` holds a date range of attendance as four parallel
+columns -- user id, day ordinal, status code and hours -- about 13 bytes
+per record instead of a full ORM instance, so a year of attendance for
+every employee fits comfortably in a worker. Rows are streamed from the
+database in batches straight into the columns.
+
+Group-bys (per user, department, weekday or month) and streaks are computed
+over whole columns: with NumPy installed they are vectorised
+(``bincount``/``diff``), otherwise the same results come from plain loops
+over the stdlib ``array`` columns. NumPy is optional.
+"""
+from array import array
+from datetime import date
+from sqlalchemy import select
+from app import db
+from models import User
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speed-up
+    np = None
+
+STATUSES = ('present', 'late', 'absent', 'half-day')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+LATE = STATUS_CODES['late']
+ABSENT = STATUS_CODES['absent']
+
+GROUP_KEYS = ('user', 'department', 'weekday', 'month')
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+BATCH_SIZE = 10000
+
+
+class AttendanceFrame:
+    def __init__(self, user_id=None, day=None, status=None, hours=None, departments=None):
+        self.user_id = user_id if user_id is not None else array('i')
+        self.day = day if day is not None else array('i')
+        self.status = status if status is not None else array('b')
+        self.hours = hours if hours is not None else array('f')
+        self.departments = departments or {}
+
+    @classmethod
+    def load(cls, start, end, user_ids=None, department=None, batch_size=BATCH_SIZE):
+        """Stream attendance for [start, end) into a new frame."""
+        from archive import attendance_table
+        from workcalendar import day_offset
+        frame = cls()
+        base = start.toordinal()
+        attendance = attendance_table(start, end, user_ids).c
+        offset = day_offset(start, attendance.date)
+        # Let the database turn dates and statuses into integers where it can;
+        # parsing a date string per row is most of the load time otherwise
+        day = offset + base if offset is not None else attendance.date
+        status = db.case(*((attendance.status == name, code) for name, code in STATUS_CODES.items()),
+                         else_=0)
+        statement = select(attendance.user_id, day, status,
+                           db.func.coalesce(attendance.working_hours, 0.0))\
+            .where(attendance.date >= start, attendance.date < end)
+        users = select(User.id, User.department)
+        if user_ids is not None:
+            statement = statement.where(attendance.user_id.in_(user_ids))
+            users = users.where(User.id.in_(user_ids))
+        if department:
+            statement = statement.join(User, User.id == attendance.user_id)\
+                .where(User.department == department)
+            users = users.where(User.department == department)
+
+        connection = db.session.connection()
+        frame.departments = {user_id: dept or 'General' for user_id, dept in connection.execute(users)}
+        result = connection.execute(statement.execution_options(yield_per=batch_size))
+        for batch in result.partitions():
+            user_ids_, days, statuses, hours = zip(*batch)
+            frame.user_id.extend(user_ids_)
+            if offset is not None:
+                frame.day.extend(days)
+            else:
+                frame.day.extend(day.toordinal() for day in days)
+            frame.status.extend(statuses)
+            frame.hours.extend(hours)
+        return frame
+
+    def __len__(self):
+        return len(self.user_id)
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column)
+                   for column in (self.user_id, self.day, self.status, self.hours))
+
+    def _keys(self, by):
+        """``(codes, labels)``: a group code per record and each code's label."""
+        if by == 'user':
+            labels = sorted(set(self.user_id))
+            index = {user_id: code for code, user_id in enumerate(labels)}
+            return [index[user_id] for user_id in self.user_id], labels
+        if by == 'department':
+            labels = sorted(set(self.departments.values()) | {'General'})
+            index = {name: code for code, name in enumerate(labels)}
+            per_user = {user_id: index[name] for user_id, name in self.departments.items()}
+            general = index['General']
+            return [per_user.get(user_id, general) for user_id in self.user_id], labels
+        if by == 'weekday':
+            # date.fromordinal(1) is a Monday
+            if np is not None:
+                return (np.frombuffer(self.day, dtype=np.int32) - 1) % 7, list(WEEKDAYS)
+            return [(day - 1) % 7 for day in self.day], list(WEEKDAYS)
+        if by == 'month':
+            if not self.day:
+                return [], []
+            first = min(self.day)
+            months = {}
+            lookup = []
+            for ordinal in range(first, max(self.day) + 1):
+                when = date.fromordinal(ordinal)
+                lookup.append(months.setdefault(f'{when.year}-{when.month:02d}', len(months)))
+            labels = sorted(months, key=months.get)
+            if np is not None:
+                return np.asarray(lookup)[np.frombuffer(self.day, dtype=np.int32) - first], labels
+            return [lookup[day - first] for day in self.day], labels
+        raise ValueError(f'by must be one of {", ".join(GROUP_KEYS)}')
+
+    def group_by(self, by):
+        """Per-group records, total/mean hours, late and absent counts and
+        the lateness rate, as ``{label: {...}}``. Means and rates are over
+        attended records, leaving out recorded absences."""
+        codes, labels = self._keys(by)
+        size = len(labels)
+        if np is not None and len(self):
+            codes = np.asarray(codes)
+            status = np.frombuffer(self.status, dtype=np.int8)
+            records = np.bincount(codes, minlength=size)
+            hours = np.bincount(codes, weights=np.frombuffer(self.hours, dtype=np.float32), minlength=size)
+            late = np.bincount(codes, weights=status == LATE, minlength=size)
+            absent = np.bincount(codes, weights=status == ABSENT, minlength=size)
+        else:
+            records, hours, late, absent = [0] * size, [0.0] * size, [0] * size, [0] * size
+            for code, status, worked in zip(codes, self.status, self.hours):
+                records[code] += 1
+                hours[code] += worked
+                if status == LATE:
+                    late[code] += 1
+                elif status == ABSENT:
+                    absent[code] += 1
+
+        groups = {}
+        for code, label in enumerate(labels):
+            count = int(records[code])
+            if not count:
+                continue
+            attended = count - int(absent[code])
+            groups[label] = {
+                'records': count,
+                'total_hours': round(float(hours[code]), 2),
+                'mean_hours': round(float(hours[code]) / attended, 2) if attended else 0.0,
+                'late': int(late[code]),
+                'absent': int(absent[code]),
+                'late_rate': round(int(late[code]) / attended, 4) if attended else 0.0,
+            }
+        return groups
+
+    def streaks(self, working_days, status=None):
+        """Longest and current run of consecutive working days each user
+        attended (or, with ``status``, had that status, e.g. 'late').
+
+        ``working_days`` is the sorted list of working-day ordinals in the
+        range; weekends and holidays neither break nor extend a run.
+        Returns ``{user_id: {'longest': n, 'current': n}}``.
+        """
+        position = {day: index for index, day in enumerate(working_days)}
+        last = len(working_days) - 1
+        wanted = STATUS_CODES[status] if status else None
+        per_user = {}
+        for user_id, day, code in zip(self.user_id, self.day, self.status):
+            if day not in position or code == ABSENT or (wanted is not None and code != wanted):
+                continue
+            per_user.setdefault(user_id, []).append(position[day])
+
+        result = {}
+        for user_id, indexes in per_user.items():
+            indexes.sort()
+            if np is not None:
+                runs = _runs_numpy(np.asarray(indexes))
+            else:
+                runs = _runs(indexes)
+            longest = max(length for _, length in runs)
+            end, length = runs[-1]
+            result[user_id] = {'longest': longest, 'current': length if end == last else 0}
+        return result
+
+
+def _runs(indexes):
+    """``[(last_index, length)]`` for each run of consecutive integers."""
+    runs = []
+    start = previous = indexes[0]
+    for index in indexes[1:]:
+        if index != previous + 1:
+            runs.append((previous, previous - start + 1))
+            start = index
+        previous = index
+    runs.append((previous, previous - start + 1))
+    return runs
+
+
+def _runs_numpy(indexes):
+    breaks = np.flatnonzero(np.diff(indexes) != 1)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(indexes) - 1]))
+    return [(int(indexes[end]), int(end - start + 1)) for start, end in zip(starts, ends)]
+
+
+def working_days(start, end):
+    """Sorted working-day ordinals in [start, end) per the configured calendar."""
+    from workcalendar import working_mask
+    mask = working_mask(start, end)
+    base = start.toordinal()
+    return [base + offset for offset in range((end - start).days) if mask >> offset & 1]
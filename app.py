@@ -1,51 +1,83 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from config import Config
+from instrumentation import QueryCounter, RequestProfiler
+from cache import Cache
+from dbengine import EngineTuning
+from identity import IdentityCache
+from passwords import PasswordHasher
+from events import EventHub
+from assets import Assets
 
 db = SQLAlchemy()
-migrate = Migrate()
 login_manager = LoginManager()
+query_counter = QueryCounter()
+profiler = RequestProfiler()
+cache = Cache()
+engine_tuning = EngineTuning()
+identity_cache = IdentityCache()
+password_hasher = PasswordHasher()
+event_hub = EventHub()
+assets = Assets()
 login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
 
-def create_app(config_class=Config):
+def _live_counters():
+    from reports import live_counters
+    return live_counters()
+
+def _serves_requests():
+    """False under CLI commands other than `flask run` (`flask scheduler run`
+    polls in the foreground instead). The reloader's parent process counts
+    too; the job leases keep that harmless."""
+    context = click.get_current_context(silent=True)
+    return context is None or context.info_name == 'run'
+
+
+def create_app(config_class=Config, start_scheduler=False):
+    """``start_scheduler`` is for the entry points that serve requests
+    (run.py, wsgi.py); scripts and tests never start the polling thread."""
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    engine_tuning.init_app(app)  # must run before db.init_app reads the engine options
     db.init_app(app)
-    migrate.init_app(app, db)
+    if click.get_current_context(silent=True) is not None:
+        # Only `flask db ...` needs Flask-Migrate, and importing it (alembic)
+        # is a large share of a cold start, so web workers skip it
+        from flask_migrate import Migrate
+        Migrate(app, db)
     login_manager.init_app(app)
+    query_counter.init_app(app)
+    profiler.init_app(app)
+    cache.init_app(app, db)
+    identity_cache.init_app(app)
+    password_hasher.init_app(app)
+    event_hub.init_app(app, counters=_live_counters)
+    assets.init_app(app)
 
     from routes.auth import auth_bp
     from routes.user import user_bp
     from routes.admin import admin_bp
+    from routes.api import api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(api_bp)
+
+    from commands import register_commands
+    register_commands(app)
 
     with app.app_context():
-        from models import User, Attendance, LeaveRequest
-        db.create_all()
-        # Create default admin if not exists
-        _create_default_admin()
+        engine_tuning.attach(db.engine)
+        from models import User, Attendance, LeaveRequest, DailyAttendanceSummary
+        import summary  # keeps DailyAttendanceSummary in step with attendance writes
+        from bootstrap import bootstrap
+        bootstrap(app)
+        from scheduler import scheduler
+        scheduler.init_app(app, start=start_scheduler and _serves_requests())
 
     return app
-
-def _create_default_admin():
-    from models import User
-    admin = User.query.filter_by(email='admin@attendance.com').first()
-    if not admin:
-        admin = User(
-            username='admin',
-            email='admin@attendance.com',
-            full_name='System Administrator',
-            role='admin',
-            department='Administration',
-            is_approved=True
-        )
-        admin.set_password('admin123')
-        db.session.add(admin)
-        db.session.commit()
@@ -0,0 +1,212 @@
+"""Per-year archive tables for closed months of attendance.
+
+``flask archive run --before 2026-01`` moves attendance older than the given
+month out of ``attendance`` into ``attendance_archive_<year>`` tables (same
+columns and ids, their own indexes), recording each table's date range in
+``attendance_archives``. ``flask archive restore`` moves a range back. The
+daily rollup and report snapshots are unaffected: the rows still exist, they
+just live elsewhere.
+
+Readers that may look at history go through :func:`attendance_table` (Core)
+or :func:`attendance_entity` (ORM) with the date range they need. Ranges
+that overlap no archive -- anything starting in the current month, which is
+never archived -- get the live table itself at no extra cost; others get a
+``UNION ALL`` of the live table and just the overlapping archive tables,
+with the range and user filters pushed into every branch. Check-ins,
+check-outs and current-month stats therefore only ever touch the small live
+table.
+
+The catalog is cached per process (and database) for ``ARCHIVE_CATALOG_TTL`` seconds, so
+other workers see an archive run or restore within that window.
+"""
+import threading
+import time as clock
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, func, select, union_all
+from sqlalchemy.orm import aliased
+from app import db
+from models import Attendance, AttendanceArchive
+
+PREFIX = 'attendance_archive_'
+
+# Kept out of db.metadata so create_all and migrations never see them
+archive_metadata = MetaData()
+
+_catalogs = {}  # engine URL -> (loaded at, ranges)
+_catalog_lock = threading.Lock()
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def archive_table(year):
+    name = f'{PREFIX}{year}'
+    table = archive_metadata.tables.get(name)
+    if table is None:
+        live = Attendance.__table__
+        table = Table(name, archive_metadata,
+                      *(Column(column.name, column.type, primary_key=column.primary_key,
+                               nullable=column.nullable) for column in live.columns))
+        Index(f'uq_{name}_user_date', table.c.user_id, table.c.date, unique=True)
+        Index(f'ix_{name}_user_check_in', table.c.user_id, table.c.check_in)
+        Index(f'ix_{name}_date_check_in', table.c.date, table.c.check_in)
+    return table
+
+
+def catalog():
+    """``[(year, first_date, last_date)]`` of the archive tables."""
+    ttl = current_app.config.get('ARCHIVE_CATALOG_TTL', 60)
+    key = str(db.engine.url)
+    with _catalog_lock:
+        loaded, ranges = _catalogs.get(key, (None, ()))
+        if loaded is None or clock.monotonic() - loaded > ttl:
+            ranges = tuple(db.session.query(
+                AttendanceArchive.year, AttendanceArchive.first_date, AttendanceArchive.last_date)
+                .order_by(AttendanceArchive.year))
+            _catalogs[key] = (clock.monotonic(), ranges)
+        return ranges
+
+
+def forget_catalog():
+    with _catalog_lock:
+        _catalogs.clear()
+
+
+def live_floor():
+    """Archives only hold months before this one."""
+    return date.today().replace(day=1)
+
+
+def archived_years(start=None, end=None):
+    """Years whose archive overlaps [start, end); either bound may be None."""
+    if start is not None and start >= live_floor():
+        return []
+    return [year for year, first, last in catalog()
+            if (end is None or first < end) and (start is None or last >= start)]
+
+
+def is_archived(day):
+    return bool(archived_years(day, day + timedelta(days=1)))
+
+
+def _branch(table, start, end, user_ids):
+    statement = select(*(table.c[column.name] for column in Attendance.__table__.columns))
+    if start is not None:
+        statement = statement.where(table.c.date >= start)
+    if end is not None:
+        statement = statement.where(table.c.date < end)
+    if user_ids is not None:
+        statement = statement.where(table.c.user_id.in_(user_ids))
+    return statement
+
+
+def attendance_sources(start=None, end=None):
+    """The live table followed by the archive tables overlapping [start, end)."""
+    return [Attendance.__table__] + [archive_table(year) for year in archived_years(start, end)]
+
+
+def attendance_table(start=None, end=None, user_ids=None):
+    """Attendance for [start, end) as a selectable with the live table's
+    columns: the table itself, or a UNION ALL with the overlapping archives."""
+    sources = attendance_sources(start, end)
+    if len(sources) == 1:
+        return Attendance.__table__
+    return union_all(*(_branch(table, start, end, user_ids) for table in sources))\
+        .subquery('attendance_all')
+
+
+def attendance_entity(start=None, end=None, user_ids=None):
+    """``Attendance``, or an alias of it over :func:`attendance_table`.
+
+    Rows loaded through an alias are read-only history: archived rows have
+    no live row to update.
+    """
+    source = attendance_table(start, end, user_ids)
+    if source is Attendance.__table__:
+        return Attendance
+    return aliased(Attendance, source, adapt_on_names=True)
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _check_range(start, end):
+    if start is not None and start != _month_start(start) or end != _month_start(end):
+        raise ArchiveError('ranges must start on the first of a month')
+    if start is not None and start >= end:
+        raise ArchiveError('start must be before end')
+    if end > live_floor():
+        raise ArchiveError(f'only closed months can be archived (before {live_floor():%Y-%m})')
+
+
+def _years(start, end):
+    return range(start.year, (end - timedelta(days=1)).year + 1)
+
+
+def _refresh_catalog_row(connection, year):
+    table = archive_table(year)
+    first, last, count = connection.execute(
+        select(func.min(table.c.date), func.max(table.c.date), func.count())).one()
+    catalog_table = AttendanceArchive.__table__
+    connection.execute(catalog_table.delete().where(catalog_table.c.year == year))
+    if count:
+        connection.execute(catalog_table.insert().values(
+            year=year, first_date=first, last_date=last, row_count=count, updated_at=datetime.utcnow()))
+    else:
+        table.drop(connection)
+    return count
+
+
+def archive_range(start, end):
+    """Move attendance in [start, end) into the archive; ``start=None``
+    means everything before ``end``. Returns ``{year: rows_moved}``."""
+    _check_range(start, end)
+    live = Attendance.__table__
+    if start is None:
+        oldest = db.session.query(func.min(Attendance.date)).scalar()
+        if oldest is None or oldest >= end:
+            return {}
+        start = _month_start(oldest)
+    connection = db.session.connection()
+    columns = [column.name for column in live.columns]
+    moved = {}
+    for year in _years(start, end):
+        low, high = max(start, date(year, 1, 1)), min(end, date(year + 1, 1, 1))
+        table = archive_table(year)
+        table.create(connection, checkfirst=True)
+        rows = _branch(live, low, high, None)
+        connection.execute(table.insert().from_select(columns, rows))
+        count = connection.execute(live.delete().where(live.c.date >= low, live.c.date < high)).rowcount
+        _refresh_catalog_row(connection, year)
+        if count:
+            moved[year] = count
+    db.session.commit()
+    forget_catalog()
+    return moved
+
+
+def restore_range(start, end):
+    """Move archived attendance in [start, end) back into the live table."""
+    _check_range(start, end)
+    live = Attendance.__table__
+    connection = db.session.connection()
+    columns = [column.name for column in live.columns]
+    years = db.session.query(AttendanceArchive.year).filter(AttendanceArchive.first_date < end)
+    if start is not None:
+        years = years.filter(AttendanceArchive.last_date >= start)
+    restored = {}
+    for year, in years.order_by(AttendanceArchive.year).all():
+        table = archive_table(year)
+        rows = _branch(table, start, end, None)
+        connection.execute(live.insert().from_select(columns, rows))
+        condition = [table.c.date < end] + ([table.c.date >= start] if start is not None else [])
+        count = connection.execute(table.delete().where(*condition)).rowcount
+        _refresh_catalog_row(connection, year)
+        if count:
+            restored[year] = count
+    db.session.commit()
+    forget_catalog()
+    return restored
@@ -0,0 +1,180 @@
+"""Fingerprinted, precompressed static assets.
+
+``python -m assets`` minifies everything under ``static/`` into
+``static/dist/`` with a content hash in each file name
+(``css/style.3f2a9c1b04de.css``), writes ``.gz`` (and ``.br`` when the
+``brotli`` package is installed) variants next to them, and records the
+mapping in ``static/dist/manifest.json``.
+
+:class:`Assets` loads the manifest once in ``create_app``. Templates link
+files with ``asset_url('css/style.css')`` -- same arguments as
+``url_for('static', filename=...)`` -- and get the hashed URL, which is
+served with the best precompressed variant the client accepts and an
+immutable one-year ``Cache-Control``: a new deploy changes the URL, not the
+file behind it. Without a build the helper falls back to plain ``static``
+URLs, so development needs no extra step.
+
+The minifiers are deliberately conservative (comments and whitespace only,
+never inside string literals) and assume no regex literals in JS.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip is always built
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+MIN_COMPRESS_SIZE = 256
+
+_CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')|(/\*.*?\*/)''', re.S)
+_JS_TOKENS = re.compile(r'''("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)|(/\*.*?\*/|//[^\n]*)''', re.S)
+
+
+def _minify(source, tokens, squeeze):
+    # Drop comments first so whitespace on either side of them can merge
+    source = tokens.sub(lambda m: m.group(1) or ('' if m.group(2).startswith('//') else ' '), source)
+    out, position = [], 0
+    for match in tokens.finditer(source):
+        out.append(squeeze(source[position:match.start()]))
+        out.append(match.group(1))  # string literals are kept verbatim
+        position = match.end()
+    out.append(squeeze(source[position:]))
+    return ''.join(out).strip()
+
+
+def _squeeze_css(code):
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+    return re.sub(r':\s+', ':', code).replace(';}', '}')
+
+
+def _squeeze_js(code):
+    # Line breaks are kept so automatic semicolon insertion is unaffected
+    return re.sub(r'[ \t]*\n\s*', '\n', code)
+
+
+def minify_css(source):
+    return _minify(source, _CSS_TOKENS, _squeeze_css)
+
+
+def minify_js(source):
+    return _minify(source, _JS_TOKENS, _squeeze_js)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def fingerprint(name, content):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as handle:
+        handle.write(content)
+
+
+def build(static_dir=STATIC_DIR):
+    """Rebuild ``static_dir/dist`` and return the manifest."""
+    out_dir = os.path.join(static_dir, DIST)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != out_dir)
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            ext = os.path.splitext(filename)[1].lower()
+            with open(path, 'rb') as handle:
+                content = handle.read()
+            if ext in MINIFIERS:
+                content = MINIFIERS[ext](content.decode('utf-8')).encode('utf-8')
+
+            hashed = fingerprint(name, content)
+            target = os.path.join(out_dir, hashed)
+            _write(target, content)
+            if ext in COMPRESSIBLE and len(content) >= MIN_COMPRESS_SIZE:
+                _write(target + '.gz', gzip.compress(content, 9, mtime=0))
+                if brotli is not None:
+                    _write(target + '.br', brotli.compress(content))
+            manifest[name] = hashed
+
+    _write(os.path.join(out_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.dist_dir = None
+        self.max_age = 31536000
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_MANIFEST', os.path.join(app.static_folder, DIST, MANIFEST))
+        app.config.setdefault('ASSETS_MAX_AGE', 31536000)
+
+        path = app.config['ASSETS_MANIFEST']
+        try:
+            with open(path) as handle:
+                self.manifest = json.load(handle)
+        except FileNotFoundError:
+            self.manifest = {}
+        self.dist_dir = os.path.dirname(path)
+        self.max_age = app.config['ASSETS_MAX_AGE']
+
+        app.add_url_rule(f'{app.static_url_path}/{DIST}/<path:filename>', 'assets', self.send)
+        app.add_template_global(self.url, 'asset_url')
+        app.extensions['assets'] = self
+
+    def url(self, filename, **values):
+        hashed = self.manifest.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename, **values)
+        return url_for('assets', filename=hashed, **values)
+
+    def send(self, filename):
+        if filename == MANIFEST or filename.endswith(('.gz', '.br')):
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in request.accept_encodings and \
+                    os.path.isfile(os.path.join(self.dist_dir, filename + suffix)):
+                encoding = candidate
+                filename += suffix
+                break
+
+        response = send_from_directory(self.dist_dir, filename, mimetype=mimetype, max_age=self.max_age)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.content_encoding = encoding
+        return response
+
+
+def main(argv=None):
+    static_dir = (argv or sys.argv[1:] or [STATIC_DIR])[0]
+    manifest = build(static_dir)
+    print(f'Built {len(manifest)} assets into {os.path.join(static_dir, DIST)}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Seed a throwaway database and run the load scenarios.
+
+    python -m benchmarks --users 500 --days 90 --threads 16 --output bench.json
+
+Prints (or writes) one JSON document with the dataset parameters and, per
+scenario, request counts, errors, throughput, p50/p95/p99 latency and query
+counts. Scenarios run in the order given; ``checkin_storm`` changes the data
+(today's check-ins), so put it last when comparing read scenarios.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+def parse_args(argv=None):
+    from benchmarks.runner import SCENARIOS
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=25, help='requests per thread')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', help='database URL (default: a temporary SQLite file)')
+    parser.add_argument('--cache', default='null', choices=('null', 'memory'),
+                        help='CACHE_BACKEND; "null" measures the uncached work')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='repeatable; default runs all')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = None
+    database = args.database
+    if database is None:
+        workdir = tempfile.mkdtemp(prefix='attendease-bench-')
+        database = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        QUERY_COUNT_ENABLED = True
+        CACHE_BACKEND = args.cache
+        TESTING = True
+
+    from app import create_app, db
+    from benchmarks.runner import SCENARIOS
+    from benchmarks.seed import seed
+
+    app = create_app(BenchConfig)
+    started = time.perf_counter()
+    with app.app_context():
+        user_ids = seed(users=args.users, days=args.days, seed=args.seed)
+    seeded = time.perf_counter() - started
+
+    names = args.scenario or [name for name in SCENARIOS if name != 'checkin_storm'] + ['checkin_storm']
+    report = {
+        'meta': {
+            'users': args.users,
+            'days': args.days,
+            'threads': args.threads,
+            'iterations': args.iterations,
+            'seed': args.seed,
+            'cache': args.cache,
+            'hash_method': app.config['PASSWORD_HASH_METHOD'],
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split('://')[0],
+            'python': platform.python_version(),
+            'seed_s': round(seeded, 2),
+        },
+        'scenarios': {},
+    }
+    for name in names:
+        report['scenarios'][name] = SCENARIOS[name](app, user_ids, args.threads, args.iterations)
+
+    with app.app_context():
+        db.engine.dispose()
+    if workdir is not None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+    failed = any(result['errors'] or result.get('exceptions') for result in report['scenarios'].values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
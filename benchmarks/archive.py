@@ -0,0 +1,111 @@
+"""Hot-path latency as history grows, with and without the archive.
+
+    python -m benchmarks.archive --users 100 --days 90 365 730 --iterations 50
+
+For each history length a fresh database is seeded and the day-to-day
+requests -- the employee dashboard (today's row plus month stats), the first
+page of attendance history and the current month's admin report -- are
+timed; then everything before the current month is archived
+(``archive.archive_range``) and they are timed again. A report for a month
+that now lives in the archive is timed too, as the cost of read-through.
+Output is JSON.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+def _paths(user_id, today):
+    history = today.replace(day=1) - timedelta(days=1)
+    return {
+        'user_dashboard': (user_id, '/user/dashboard'),
+        'history_first_page': (user_id, '/user/attendance-history'),
+        'current_report': (None, f'/admin/attendance/report?year={today.year}&month={today.month}'),
+        'archived_report': (None, f'/admin/attendance/report?year={history.year}&month={history.month}'),
+    }
+
+
+def measure(app, user_ids, iterations):
+    from benchmarks.runner import Recorder, _admin_id, client_for, timed
+    admin_id = _admin_id(app)
+    results = {}
+    for name, (user_id, path) in _paths(user_ids[0], date.today()).items():
+        recorder = Recorder()
+        client = client_for(app, user_id or admin_id)
+        for n in range(iterations):
+            if user_id is not None:
+                client = client_for(app, user_ids[n % len(user_ids)])
+            timed(recorder, client.get, path)
+        summary = recorder.summary(sum(recorder.latencies))
+        results[name] = {'latency_ms': summary['latency_ms'], 'queries': summary.get('queries'),
+                         'errors': summary['errors']}
+    return results
+
+
+def run(days, args, workdir):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(workdir, f'archive{days}.db')
+        QUERY_COUNT_ENABLED = True
+        CACHE_BACKEND = 'null'
+        ARCHIVE_CATALOG_TTL = 3600
+        TESTING = True
+
+    from app import create_app, db
+    from archive import archive_range, live_floor
+    from benchmarks.seed import seed
+    from models import Attendance
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        user_ids = seed(users=args.users, days=days, seed=args.seed)
+        total = Attendance.query.count()
+    before = measure(app, user_ids, args.iterations)
+    with app.app_context():
+        moved = archive_range(None, live_floor())
+    after = measure(app, user_ids, args.iterations)
+    with app.app_context():
+        db.engine.dispose()
+    return {
+        'attendance_rows': total,
+        'archived_rows': sum(moved.values()),
+        'live_only': before,
+        'archived': after,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.archive', description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--days', type=int, nargs='+', default=[90, 365, 730])
+    parser.add_argument('--iterations', type=int, default=50, help='requests per path')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='attendease-archive-')
+    try:
+        report = {
+            'meta': {'users': args.users, 'iterations': args.iterations, 'seed': args.seed},
+            'history': {str(days): run(days, args, workdir) for days in args.days},
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
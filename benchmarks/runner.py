@@ -0,0 +1,194 @@
+"""Multi-threaded driver and the benchmark scenarios.
+
+Each worker thread gets its own Flask test client, logged in by writing the
+Flask-Login session directly (password hashing would otherwise dominate),
+and issues requests back to back. Latency is measured around each request;
+query counts come from the ``X-Query-Count`` header that
+``QUERY_COUNT_ENABLED`` adds, so they are per request even under
+concurrency.
+"""
+import math
+import threading
+import time
+from datetime import date
+from models import User, Attendance
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, elapsed, response, ok_statuses=(200, 302)):
+        count = response.headers.get('X-Query-Count')
+        with self._lock:
+            self.latencies.append(elapsed)
+            if count is not None:
+                self.queries.append(int(count))
+            self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+            if response.status_code not in ok_statuses:
+                self.errors += 1
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self, wall):
+        latencies = sorted(ms * 1000 for ms in self.latencies)
+        result = {
+            'requests': len(latencies),
+            'errors': self.errors,
+            'statuses': {str(code): n for code, n in sorted(self.statuses.items())},
+            'wall_s': round(wall, 3),
+            'throughput_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                'p50': round(percentile(latencies, 50), 2),
+                'p95': round(percentile(latencies, 95), 2),
+                'p99': round(percentile(latencies, 99), 2),
+                'max': round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+        if self.queries:
+            result['queries'] = {
+                'mean': round(sum(self.queries) / len(self.queries), 2),
+                'max': max(self.queries),
+            }
+        return result
+
+
+def client_for(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def timed(recorder, call, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = call(*args, **kwargs)
+    except Exception:
+        recorder.error()
+        raise
+    recorder.record(time.perf_counter() - start, response)
+    return response
+
+
+def drive(threads, work):
+    """Run ``work(index, recorder)`` on ``threads`` threads; return the summary."""
+    recorder = Recorder()
+    failures = []
+
+    def target(index):
+        try:
+            work(index, recorder)
+        except Exception as exc:  # keep the other threads going, report at the end
+            failures.append(repr(exc))
+
+    workers = [threading.Thread(target=target, args=(index,)) for index in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    result = recorder.summary(time.perf_counter() - start)
+    if failures:
+        result['exceptions'] = failures[:5]
+    return result
+
+
+def _admin_id(app):
+    with app.app_context():
+        return User.query.filter_by(role='admin').with_entities(User.id).scalar()
+
+
+@scenario('login')
+def login(app, user_ids, threads, iterations):
+    """Employees logging in with their password (the morning rush)."""
+    from benchmarks.seed import PASSWORD
+    with app.app_context():
+        emails = [email for email, in User.query.filter(User.id.in_(user_ids))
+                  .with_entities(User.email).order_by(User.id)]
+
+    def work(index, recorder):
+        mine = emails[index::threads] or emails
+        for n in range(iterations):
+            client = app.test_client()
+            timed(recorder, client.post, '/login',
+                  data={'email': mine[n % len(mine)], 'password': PASSWORD})
+    return drive(threads, work)
+
+
+@scenario('checkin_storm')
+def checkin_storm(app, user_ids, threads, iterations):
+    """Every seeded employee checks in once, all at the same time."""
+    def work(index, recorder):
+        for user_id in user_ids[index::threads]:
+            client = client_for(app, user_id)
+            timed(recorder, client.post, '/user/check-in')
+    result = drive(threads, work)
+    with app.app_context():
+        # A redirect is also what a failed check-in returns, so count the rows
+        result['checked_in'] = Attendance.query.filter(
+            Attendance.user_id.in_(user_ids), Attendance.date == date.today()).count()
+    return result
+
+
+@scenario('admin_report')
+def admin_report(app, user_ids, threads, iterations):
+    """Admins rendering the current monthly report."""
+    today = date.today()
+    admin_id = _admin_id(app)
+
+    def work(index, recorder):
+        client = client_for(app, admin_id)
+        for _ in range(iterations):
+            timed(recorder, client.get,
+                  f'/admin/attendance/report?year={today.year}&month={today.month}')
+    return drive(threads, work)
+
+
+@scenario('dashboard_stats')
+def dashboard_stats(app, user_ids, threads, iterations):
+    """Admin dashboards polling the stats endpoint across trend windows."""
+    admin_id = _admin_id(app)
+    windows = (7, 30, 90)
+
+    def work(index, recorder):
+        client = client_for(app, admin_id)
+        for n in range(iterations):
+            timed(recorder, client.get, f'/admin/api/dashboard-stats?days={windows[n % len(windows)]}')
+    return drive(threads, work)
+
+
+@scenario('history_paging')
+def history_paging(app, user_ids, threads, iterations):
+    """Employees paging back through their attendance history."""
+    def work(index, recorder):
+        mine = user_ids[index::threads] or user_ids
+        for n in range(iterations):
+            client = client_for(app, mine[n % len(mine)])
+            timed(recorder, client.get, f'/user/attendance-history?page={n % 4 + 1}')
+    return drive(threads, work)
@@ -0,0 +1,78 @@
+"""Synthetic data for benchmarks.
+
+Seeds ``users`` approved employees with ``days`` days of attendance before
+today (weekdays only, ~90% turnout, a share of late arrivals) and a sprinkle
+of approved and pending leave. Rows go in with executemany inserts and the
+daily rollup is rebuilt once at the end, so even large datasets load in
+seconds. Everything is derived from ``seed`` so runs are reproducible.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert
+from app import db
+from models import User, Attendance, LeaveRequest
+from summary import rebuild_summary
+
+PASSWORD = 'bench-pass'
+DEPARTMENTS = ('Engineering', 'Operations', 'Sales', 'Support', 'HR', 'Finance')
+BATCH_SIZE = 5000
+
+
+def _flush(table, rows):
+    if rows:
+        db.session.execute(insert(table), rows)
+        rows.clear()
+
+
+def seed(users=200, days=60, seed=0, today=None):
+    """Load the dataset into the current app's database; returns user ids."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    created = datetime.combine(today - timedelta(days=days + 30), time(9))
+
+    # One hash for everyone: hashing is deliberately slow and not what we measure
+    probe = User(username='-', email='-', full_name='-')
+    probe.set_password(PASSWORD)
+    db.session.execute(insert(User), [{
+        'username': f'bench{n}', 'email': f'bench{n}@example.com',
+        'password_hash': probe.password_hash, 'full_name': f'Bench User {n}',
+        'role': 'user', 'department': DEPARTMENTS[n % len(DEPARTMENTS)],
+        'phone': '', 'is_approved': True, 'created_at': created,
+    } for n in range(users)])
+    user_ids = [row.id for row in db.session.query(User.id)
+                .filter(User.username.like('bench%')).order_by(User.id)]
+
+    rows = []
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        for user_id in user_ids:
+            if rng.random() >= 0.9:
+                continue
+            check_in = datetime.combine(day, time(8, 30)) + timedelta(minutes=rng.randint(0, 90))
+            check_out = check_in + timedelta(hours=rng.uniform(6, 10))
+            rows.append({
+                'user_id': user_id, 'date': day, 'check_in': check_in, 'check_out': check_out,
+                'status': Attendance.status_for(check_in),
+                'working_hours': Attendance.hours_between(check_in, check_out), 'notes': '',
+            })
+            if len(rows) >= BATCH_SIZE:
+                _flush(Attendance, rows)
+    _flush(Attendance, rows)
+
+    leaves = []
+    for user_id in user_ids:
+        if rng.random() < 0.2:
+            start = today - timedelta(days=rng.randint(0, days))
+            leaves.append({
+                'user_id': user_id, 'leave_type': rng.choice(('sick', 'casual', 'vacation')),
+                'start_date': start, 'end_date': start + timedelta(days=rng.randint(0, 4)),
+                'reason': 'benchmark', 'status': rng.choice(('approved', 'approved', 'pending')),
+                'admin_remarks': '', 'created_at': created, 'updated_at': created,
+            })
+    _flush(LeaveRequest, leaves)
+
+    rebuild_summary()
+    db.session.commit()
+    return user_ids
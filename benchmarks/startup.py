@@ -0,0 +1,88 @@
+"""Cold-start benchmark: import + ``create_app`` in fresh interpreters.
+
+    python -m benchmarks.startup --runs 10
+
+Each run starts a new Python process (as a serverless cold start does) and
+reports how long importing ``app`` and calling ``create_app`` took, against
+an empty database (first boot) and an already bootstrapped one (every later
+boot), as JSON.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.runner import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({"import": imported - start, "create_app": created - imported}))
+'''
+
+
+def run_once(database, env=None):
+    environ = dict(os.environ, DATABASE_URL=database, **(env or {}))
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=environ,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    result = {}
+    for key in ('import', 'create_app', 'total'):
+        values = sorted(sample[key] * 1000 for sample in samples)
+        result[key] = {
+            'p50': round(percentile(values, 50), 1),
+            'p95': round(percentile(values, 95), 1),
+            'min': round(values[0], 1),
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--bootstrap', default='auto', choices=('auto', 'always'),
+                        help='DB_BOOTSTRAP for the runs; "always" reproduces the old startup')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='attendease-startup-')
+    env = {'DB_BOOTSTRAP': args.bootstrap}
+    try:
+        fresh, warm = [], []
+        bootstrapped = 'sqlite:///' + os.path.join(workdir, 'current.db')
+        run_once(bootstrapped, env)
+        for n in range(args.runs):
+            fresh.append(run_once('sqlite:///' + os.path.join(workdir, f'fresh{n}.db'), env))
+            warm.append(run_once(bootstrapped, env))
+        for sample in fresh + warm:
+            sample['total'] = sample['import'] + sample['create_app']
+        report = {
+            'meta': {'runs': args.runs, 'bootstrap': args.bootstrap},
+            'empty_database_ms': summarize(fresh),
+            'bootstrapped_database_ms': summarize(warm),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Schema creation and default-admin seeding at startup.
+
+``create_app`` used to run ``db.create_all()`` and look up (and possibly
+hash a password for) the default admin on every start, which is most of a
+serverless cold start. Databases created here are stamped with the current
+migration head in ``alembic_version``; later starts see the stamp with one
+query and skip the rest.
+
+``DB_BOOTSTRAP`` selects the behaviour:
+
+* ``auto`` (default): bootstrap unless the stamp is already current.
+* ``always``: bootstrap on every start (the old behaviour).
+* ``never``: never touch the schema at startup; run ``flask init-db`` once.
+
+The default admin gets a precomputed password hash rather than one made at
+startup, so even a first boot (every Vercel cold start, since ``/tmp``
+starts empty) pays only for ``create_all``.
+
+Only databases that were empty are stamped. An existing database without a
+current stamp still gets ``create_all`` as before, but is left for
+``flask db upgrade`` to bring up to date, since stamping it would skip
+migrations that change existing tables.
+"""
+import glob
+import logging
+import os
+import re
+from sqlalchemy import Column, MetaData, String, Table, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations', 'versions')
+
+DEFAULT_ADMIN = {
+    'username': 'admin',
+    'email': 'admin@attendance.com',
+    'full_name': 'System Administrator',
+    'role': 'admin',
+    'department': 'Administration',
+    'is_approved': True,
+}
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+# werkzeug's scrypt hash of DEFAULT_ADMIN_PASSWORD. Hashing it at startup was
+# over half of a first boot, and a Vercel cold start is always a first boot
+# (/tmp starts empty). Logging in upgrades it if PASSWORD_HASH_METHOD differs.
+DEFAULT_ADMIN_PASSWORD_HASH = (
+    'scrypt:32768:8:1$yRFQiuWGB4VQLV5y$586135ddfb363d24d5ece3ed4e779a70a352c5eef2eaa4a5522e0c'
+    '6db3a42d8a1c3f394d7ea7fd19108642146daf2e2dd1ae9b7c425d017231b773a21a321781')
+
+# Same shape as the table alembic creates, so `flask db` commands keep working
+alembic_version = Table('alembic_version', MetaData(),
+                        Column('version_num', String(32), primary_key=True))
+
+_REVISION = re.compile(r"^(down_revision|revision)\s*=\s*['\"]?([\w]+)?['\"]?", re.M)
+_head = None
+
+
+def head_revision():
+    """Newest migration id, read from the revision files without alembic."""
+    global _head
+    if _head is None:
+        revisions, parents = set(), set()
+        for path in glob.glob(os.path.join(MIGRATIONS_DIR, '*.py')):
+            with open(path) as handle:
+                for name, value in _REVISION.findall(handle.read()):
+                    if value and value != 'None':
+                        (revisions if name == 'revision' else parents).add(value)
+        heads = revisions - parents
+        _head = heads.pop() if len(heads) == 1 else None
+    return _head
+
+
+def stamped_revision():
+    """The revision in ``alembic_version``, or None if there is none."""
+    try:
+        return db.session.execute(select(alembic_version.c.version_num)).scalar()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return None
+
+
+def stamp(revision):
+    alembic_version.create(db.engine, checkfirst=True)
+    db.session.execute(alembic_version.delete())
+    db.session.execute(alembic_version.insert().values(version_num=revision))
+    db.session.commit()
+
+
+def create_default_admin():
+    from models import User
+    if User.query.filter_by(email=DEFAULT_ADMIN['email']).first():
+        return False
+    admin = User(password_hash=DEFAULT_ADMIN_PASSWORD_HASH, **DEFAULT_ADMIN)
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+
+def init_db():
+    """Create missing tables and the default admin; stamp fresh databases."""
+    fresh = not inspect(db.engine).has_table('users')
+    db.create_all()
+    create_default_admin()
+    head = head_revision()
+    if fresh and head:
+        stamp(head)
+    elif stamped_revision() != head:
+        logger.warning('Database schema is not at migration head %s; run "flask db upgrade".', head)
+    return fresh
+
+
+def bootstrap(app):
+    mode = app.config.get('DB_BOOTSTRAP', 'auto')
+    if mode == 'never':
+        return
+    if mode == 'auto' and head_revision() and stamped_revision() == head_revision():
+        return
+    init_db()
@@ -0,0 +1,178 @@
+"""Bulk admin actions on users and leave requests.
+
+Targets are either explicit IDs or a filter (e.g. every pending leave in one
+department). Each call classifies its targets with one SELECT per chunk of
+IDs, applies the change with set-based ``UPDATE``/``DELETE`` statements and
+commits once, so a batch either lands completely or not at all. Every
+requested ID gets an outcome: the past tense of the action (``approved``,
+``deactivated``, ``rejected``), ``unchanged``, ``admin``, ``has_history``,
+``not_found``, or ``not_matched`` when it exists but falls outside the
+filter.
+"""
+from datetime import datetime
+from sqlalchemy import delete, exists, update
+from app import db, identity_cache
+from models import User, LeaveRequest
+from snapshots import drop_snapshots
+from archive import attendance_table
+
+CHUNK_SIZE = 500
+
+USER_ACTIONS = ('approve', 'deactivate', 'reject')
+LEAVE_ACTIONS = ('approve', 'reject')
+DONE = {'approve': 'approved', 'deactivate': 'deactivated', 'reject': 'rejected'}
+
+
+class BulkError(ValueError):
+    pass
+
+
+class BulkResult:
+    def __init__(self, action):
+        self.action = action
+        self.outcomes = {}
+
+    def mark(self, ids, outcome):
+        for id_ in ids:
+            self.outcomes[id_] = outcome
+
+    def to_dict(self):
+        counts = {}
+        for outcome in self.outcomes.values():
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return {
+            'action': self.action,
+            'counts': counts,
+            'results': [{'id': id_, 'outcome': outcome} for id_, outcome in sorted(self.outcomes.items())],
+        }
+
+
+def parse_ids(values):
+    try:
+        return sorted({int(value) for value in values})
+    except (TypeError, ValueError):
+        raise BulkError('ids must be integers')
+
+
+def _chunks(ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def _targets(query, model, ids):
+    """Rows for ``ids`` (chunked), or every row ``query`` matches."""
+    if ids is None:
+        return query.all()
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(query.filter(model.id.in_(chunk)).all())
+    return rows
+
+
+def _execute(statement, model, ids):
+    for chunk in _chunks(ids):
+        db.session.execute(statement.where(model.id.in_(chunk)),
+                           execution_options={'synchronize_session': False})
+
+
+def user_targets(filters):
+    query = User.query.with_entities(User.id, User.role, User.is_approved)
+    if filters.get('status') == 'pending':
+        query = query.filter(User.is_approved == False)
+    elif filters.get('status') == 'approved':
+        query = query.filter(User.is_approved == True)
+    if filters.get('department'):
+        query = query.filter(User.department == filters['department'])
+    return query
+
+
+def bulk_users(action, ids=None, filters=None):
+    """Approve, deactivate or reject (delete) users in one transaction.
+
+    Admin accounts are never touched, and users with attendance or leave
+    history are not deleted (deactivate them instead).
+    """
+    if action not in USER_ACTIONS:
+        raise BulkError(f'action must be one of {", ".join(USER_ACTIONS)}')
+    query = user_targets(filters or {})
+    if ids is None:
+        query = query.filter(User.role != 'admin')
+    rows = _targets(query, User, ids)
+
+    result = BulkResult(action)
+    if ids is not None:
+        result.mark(ids, 'not_matched' if filters else 'not_found')
+    eligible = []
+    for row in rows:
+        if row.role == 'admin':
+            result.mark([row.id], 'admin')
+        elif action == 'approve' and row.is_approved:
+            result.mark([row.id], 'unchanged')
+        elif action == 'deactivate' and not row.is_approved:
+            result.mark([row.id], 'unchanged')
+        else:
+            eligible.append(row.id)
+
+    if action == 'reject' and eligible:
+        with_history = set()
+        attendance = attendance_table()
+        for chunk in _chunks(eligible):
+            with_history.update(id_ for id_, in db.session.query(User.id).filter(
+                User.id.in_(chunk),
+                exists().where(attendance.c.user_id == User.id)
+                | exists().where(LeaveRequest.user_id == User.id)))
+        result.mark(with_history, 'has_history')
+        eligible = [id_ for id_ in eligible if id_ not in with_history]
+
+    if action == 'reject':
+        _execute(delete(User), User, eligible)
+    else:
+        _execute(update(User).values(is_approved=action == 'approve'), User, eligible)
+    result.mark(eligible, DONE[action])
+    db.session.commit()
+    identity_cache.invalidate(*eligible)
+    return result
+
+
+def leave_targets(filters):
+    query = LeaveRequest.query.with_entities(LeaveRequest.id, LeaveRequest.status,
+                                             LeaveRequest.start_date, LeaveRequest.end_date)
+    status = filters.get('status', 'pending')
+    if status != 'all':
+        query = query.filter(LeaveRequest.status == status)
+    if filters.get('leave_type'):
+        query = query.filter(LeaveRequest.leave_type == filters['leave_type'])
+    if filters.get('department'):
+        query = query.join(User, User.id == LeaveRequest.user_id)\
+            .filter(User.department == filters['department'])
+    return query
+
+
+def bulk_leaves(action, ids=None, filters=None, remarks=''):
+    """Approve or reject leave requests in one transaction."""
+    if action not in LEAVE_ACTIONS:
+        raise BulkError(f'action must be one of {", ".join(LEAVE_ACTIONS)}')
+    result = BulkResult(action)
+    if ids is not None:
+        result.mark(ids, 'not_matched' if filters else 'not_found')
+    filters = dict(filters or {})
+    if ids is not None:
+        filters.setdefault('status', 'all')
+    rows = _targets(leave_targets(filters), LeaveRequest, ids)
+
+    status = DONE[action]
+    eligible, ranges = [], []
+    for row in rows:
+        if row.status == status:
+            result.mark([row.id], 'unchanged')
+        else:
+            eligible.append(row.id)
+            ranges.append((row.start_date, row.end_date))
+
+    _execute(update(LeaveRequest).values(status=status, admin_remarks=remarks or '',
+                                         updated_at=datetime.utcnow()),
+             LeaveRequest, eligible)
+    result.mark(eligible, status)
+    drop_snapshots(db.session, ranges=ranges)
+    db.session.commit()
+    return result
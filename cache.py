@@ -0,0 +1,259 @@
+"""Application-level result cache with write-driven invalidation.
+
+Results are cached under (endpoint, params, user) and tagged with the
+tables they were computed from. Each tag has a generation counter that is
+folded into the cache key; committing a write to a table bumps its
+generation, so every entry computed from the old data simply stops being
+found and ages out of the LRU.
+
+Writes are picked up from the SQLAlchemy session: ORM flushes bump both
+the table tag and a per-user tag (``attendance:<user_id>``), Core
+``INSERT``/``UPDATE``/``DELETE`` statements bump the table tag and the
+table's ``*`` tag, which per-user entries also depend on.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+
+MISSING = object()
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def counters(self, keys):
+        return [self._counters.get(key, 0) for key in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared backend over a Redis-compatible client.
+
+    Anything implementing ``get``, ``mget``, ``set(key, value, ex=...)``
+    and ``incr`` works, so tests and local setups can pass a
+    stand-in client instead of a real server.
+    """
+
+    evictions = 0
+    expirations = 0
+
+    def __init__(self, client, prefix='attendease:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else pickle.loads(raw)
+
+    def counters(self, keys):
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in self.client.mget([self.prefix + key for key in keys])]
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class NullBackend:
+    evictions = 0
+    expirations = 0
+
+    def get(self, key):
+        return MISSING
+
+    def counters(self, keys):
+        return [0] * len(keys)
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+def user_scope(table, user_id):
+    """Tags for data belonging to one user in ``table``."""
+    return (f'{table}:{user_id}', f'{table}:*')
+
+
+class Cache:
+    def __init__(self, app=None, db=None):
+        self.backend = MemoryBackend()
+        self.default_ttl = 60
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._watched = []
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None, client=None):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_DEFAULT_TTL', 60)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 2048)
+        app.config.setdefault('CACHE_REDIS_URL', None)
+
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'])
+        elif backend == 'redis':
+            if client is None:
+                try:
+                    import redis
+                except ImportError:
+                    raise RuntimeError('CACHE_BACKEND="redis" requires the redis package')
+                client = redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+            self.backend = RedisBackend(client)
+        elif backend == 'null':
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+
+        app.extensions['cache'] = self
+        if db is not None:
+            self.watch(db.session)
+
+    def make_key(self, endpoint, params=None, user_id=None, tags=()):
+        params = '&'.join(f'{k}={v}' for k, v in sorted((params or {}).items()))
+        generations = '.'.join(str(g) for g in self.backend.counters([f'gen:{tag}' for tag in tags]))
+        return f'{endpoint}|{params}|{user_id or ""}|{generations}'
+
+    def get_or_set(self, endpoint, compute, params=None, user_id=None, tags=(), ttl=None):
+        key = self.make_key(endpoint, params, user_id, tags)
+        value = self.backend.get(key)
+        if value is not MISSING:
+            with self._stats_lock:
+                self.hits += 1
+            return value
+        with self._stats_lock:
+            self.misses += 1
+        value = compute()
+        self.backend.set(key, value, ttl or self.default_ttl)
+        return value
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr(f'gen:{tag}')
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'expirations': self.backend.expirations,
+        }
+
+    def watch(self, session):
+        """Invalidate tags for whatever ``session`` commits."""
+        if session in self._watched:
+            return
+        self._watched.append(session)
+
+        def pending(sess):
+            return sess.info.setdefault('cache_tags', set())
+
+        @event.listens_for(session, 'after_flush')
+        def collect_flushed(sess, flush_context):
+            tags = pending(sess)
+            for obj in list(sess.new) + list(sess.dirty) + list(sess.deleted):
+                table = getattr(obj, '__tablename__', None)
+                if table is None:
+                    continue
+                tags.add(table)
+                owner = getattr(obj, 'user_id', None)
+                if owner is None and table == 'users':
+                    owner = obj.id
+                if owner is not None:
+                    tags.add(f'{table}:{owner}')
+
+        @event.listens_for(session, 'do_orm_execute')
+        def collect_statements(orm_execute_state):
+            if orm_execute_state.is_insert or orm_execute_state.is_update \
+                    or orm_execute_state.is_delete:
+                table = getattr(orm_execute_state.statement, 'table', None)
+                if table is not None:
+                    pending(orm_execute_state.session).update({table.name, f'{table.name}:*'})
+
+        @event.listens_for(session, 'after_commit')
+        def invalidate_committed(sess):
+            tags = sess.info.pop('cache_tags', None)
+            if tags:
+                self.invalidate(*sorted(tags))
+
+        @event.listens_for(session, 'after_rollback')
+        def discard_rolled_back(sess):
+            sess.info.pop('cache_tags', None)
@@ -0,0 +1,270 @@
+from datetime import datetime
+import click
+from app import db
+
+
+def _parse_date(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise click.BadParameter('expected YYYY-MM-DD')
+
+
+def _parse_month(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise click.BadParameter('expected YYYY-MM')
+
+
+@click.command('init-db')
+def init_db_command():
+    """Create the schema and the default admin (for DB_BOOTSTRAP=never)."""
+    from bootstrap import init_db, head_revision
+    fresh = init_db()
+    click.echo(f'Created a new database at revision {head_revision()}.' if fresh
+               else 'Database already exists; created any missing tables.')
+
+
+@click.group('summary')
+def summary_cli():
+    """Maintain the daily attendance rollup."""
+
+
+@summary_cli.command('rebuild')
+@click.option('--start', callback=_parse_date, help='First date to rebuild (YYYY-MM-DD).')
+@click.option('--end', callback=_parse_date, help='Date to stop before (YYYY-MM-DD).')
+def rebuild_command(start, end):
+    """Recompute the rollup from raw attendance, e.g. after a backfill."""
+    from summary import rebuild_summary
+    rows = rebuild_summary(start, end)
+    db.session.commit()
+    click.echo(f'Rebuilt {rows} summary rows.')
+
+
+@click.group('attendance')
+def attendance_cli():
+    """Bulk attendance operations."""
+
+
+@attendance_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['json', 'csv']),
+              help='Input format; guessed from the file extension by default.')
+@click.option('--chunk-size', default=1000, show_default=True,
+              help='Attendance rows written per transaction.')
+def import_command(source, fmt, chunk_size):
+    """Import badge-reader punches from a JSON or CSV file ('-' for stdin)."""
+    from importer import import_events, parse_csv, parse_json
+    if fmt is None:
+        fmt = 'csv' if source.name.lower().endswith('.csv') else 'json'
+    data = source.read()
+    events = parse_csv(data) if fmt == 'csv' else parse_json(data)
+
+    result = import_events(events, chunk_size=chunk_size)
+    click.echo(f'{len(events)} events: {result.inserted} inserted, {result.updated} updated, '
+               f'{result.duplicates} duplicates, {len(result.errors)} failed.')
+    for error in result.errors:
+        click.echo(f"  row {error['row']}: {error['error']}", err=True)
+
+
+@click.group('scheduler')
+def scheduler_cli():
+    """Background jobs."""
+
+
+@scheduler_cli.command('run')
+@click.option('--once', is_flag=True, help='Run whatever is due and exit instead of polling.')
+def scheduler_run_command(once):
+    """Poll for due jobs in the foreground (a dedicated worker process)."""
+    from flask import current_app
+    from scheduler import run_pending, scheduler
+    if once:
+        for name, status in run_pending().items():
+            click.echo(f'{name}: {status}')
+        return
+    click.echo('Polling for due jobs; Ctrl+C to stop.')
+    scheduler.loop(current_app._get_current_object())
+
+
+@scheduler_cli.command('run-job')
+@click.argument('name')
+def scheduler_run_job_command(name):
+    """Run one job now, ahead of its schedule (still takes its lock)."""
+    from scheduler import JOBS, run_job, sync_jobs
+    sync_jobs()
+    if name not in JOBS:
+        raise click.BadParameter(f'choose from {", ".join(sorted(JOBS))}', param_hint='NAME')
+    status = run_job(name, force=True)
+    click.echo(f'{name}: {status or "locked by another worker"}')
+
+
+@scheduler_cli.command('status')
+def scheduler_status_command():
+    """Show each job's next run and last outcome."""
+    from models import ScheduledJob
+    from scheduler import sync_jobs
+    sync_jobs()
+    for row in ScheduledJob.query.order_by(ScheduledJob.next_run_at):
+        lock = f', locked by {row.locked_by} until {row.locked_until:%Y-%m-%d %H:%M}' if row.locked_by else ''
+        click.echo(f'{row.name:<18} next {row.next_run_at:%Y-%m-%d %H:%M}  '
+                   f'last {row.last_status or "never"}{lock}')
+        if row.last_result:
+            click.echo(f'{"":<18} {row.last_result}')
+
+
+@click.group('archive')
+def archive_cli():
+    """Move closed months of attendance in and out of the archive tables."""
+
+
+def _report_moved(moved, verb):
+    for year, rows in sorted(moved.items()):
+        click.echo(f'{year}: {rows} rows')
+    click.echo(f'{verb} {sum(moved.values())} rows.')
+
+
+@archive_cli.command('run')
+@click.option('--before', required=True, callback=_parse_month, help='First month to keep live (YYYY-MM).')
+@click.option('--start', callback=_parse_month, help='First month to archive (YYYY-MM); default the oldest.')
+def archive_run_command(before, start):
+    """Archive attendance from --start up to (not including) --before."""
+    from archive import ArchiveError, archive_range
+    try:
+        moved = archive_range(start, before)
+    except ArchiveError as exc:
+        raise click.UsageError(str(exc))
+    _report_moved(moved, 'Archived')
+
+
+@archive_cli.command('restore')
+@click.option('--start', callback=_parse_month, help='First month to restore (YYYY-MM); default the oldest.')
+@click.option('--end', required=True, callback=_parse_month, help='Month to stop before (YYYY-MM).')
+def archive_restore_command(start, end):
+    """Move archived attendance back into the live table."""
+    from archive import ArchiveError, restore_range
+    try:
+        restored = restore_range(start, end)
+    except ArchiveError as exc:
+        raise click.UsageError(str(exc))
+    _report_moved(restored, 'Restored')
+
+
+@archive_cli.command('status')
+def archive_status_command():
+    """List the archive tables and the live table's range."""
+    from sqlalchemy import func
+    from archive import PREFIX
+    from models import Attendance, AttendanceArchive
+    for row in AttendanceArchive.query.order_by(AttendanceArchive.year):
+        click.echo(f'{PREFIX}{row.year}  {row.first_date} .. {row.last_date}  {row.row_count} rows')
+    first, last, count = db.session.query(
+        func.min(Attendance.date), func.max(Attendance.date), func.count(Attendance.id)).one()
+    click.echo(f'{"attendance (live)":<24} {first or "-"} .. {last or "-"}  {count} rows')
+
+
+@click.group('inspect')
+def inspect_cli():
+    """Browse users, attendance and leave requests (read-only)."""
+
+
+def _output_options(func):
+    func = click.option('--limit', type=click.IntRange(min=1), help='Stop after this many rows.')(func)
+    func = click.option('--format', 'fmt', type=click.Choice(['table', 'csv', 'json']), default='table',
+                        show_default=True, help='json writes one object per line.')(func)
+    return func
+
+
+def _row_filters(func):
+    func = click.option('--status', help='Only rows with this status.')(func)
+    func = click.option('--department', help='Only employees in this department.')(func)
+    func = click.option('--user', 'user_key', help='Id, username or email.')(func)
+    func = click.option('--end', callback=_parse_date, help='Date to stop before (YYYY-MM-DD).')(func)
+    func = click.option('--start', callback=_parse_date, help='First date (YYYY-MM-DD).')(func)
+    return func
+
+
+def _user_id(user_key):
+    from inspector import UnknownUser, resolve_user
+    if user_key is None:
+        return None
+    try:
+        return resolve_user(user_key)
+    except UnknownUser:
+        raise click.BadParameter(f'no user {user_key!r}', param_hint='--user')
+
+
+def _echo_count(written, fmt, noun):
+    if fmt == 'table':
+        click.echo(f'{written} {noun}', err=True)
+
+
+@inspect_cli.command('users')
+@click.option('--role', type=click.Choice(['user', 'admin']))
+@click.option('--department', help='Only this department.')
+@click.option('--approved/--pending', default=None, help='Only approved or only pending accounts.')
+@click.option('--search', help='Substring of the username, name or email.')
+@_output_options
+def inspect_users_command(role, department, approved, search, fmt, limit):
+    """List user accounts."""
+    from inspector import USER_HEADER, user_rows, write
+    rows = user_rows(role=role, department=department, approved=approved, search=search, limit=limit)
+    _echo_count(write(USER_HEADER, rows, fmt), fmt, 'users')
+
+
+@inspect_cli.command('attendance')
+@_row_filters
+@_output_options
+def inspect_attendance_command(start, end, user_key, department, status, fmt, limit):
+    """List attendance, newest first (archived months included)."""
+    from inspector import ATTENDANCE_HEADER, attendance_rows, write
+    rows = attendance_rows(start, end, user_id=_user_id(user_key), department=department,
+                           status=status, limit=limit)
+    _echo_count(write(ATTENDANCE_HEADER, rows, fmt), fmt, 'attendance records')
+
+
+@inspect_cli.command('leaves')
+@_row_filters
+@_output_options
+def inspect_leaves_command(start, end, user_key, department, status, fmt, limit):
+    """List leave requests overlapping the dates, newest first."""
+    from inspector import LEAVE_HEADER, leave_rows, write
+    rows = leave_rows(start, end, user_id=_user_id(user_key), department=department,
+                      status=status, limit=limit)
+    _echo_count(write(LEAVE_HEADER, rows, fmt), fmt, 'leave requests')
+
+
+@inspect_cli.command('overview')
+@click.option('--limit', default=20, show_default=True, type=click.IntRange(min=1),
+              help='Rows shown per section.')
+def inspect_overview_command(limit):
+    """Counts plus the latest users, attendance and leave requests."""
+    from sqlalchemy import func
+    from inspector import (USER_HEADER, ATTENDANCE_HEADER, LEAVE_HEADER,
+                           user_rows, attendance_rows, leave_rows, write)
+    from models import User, Attendance, AttendanceArchive, LeaveRequest
+    users, pending = db.session.query(
+        func.count(User.id), func.sum(db.case((User.is_approved == False, 1), else_=0))).one()
+    archived = db.session.query(func.coalesce(func.sum(AttendanceArchive.row_count), 0)).scalar()
+    click.echo(f'{users} users ({pending or 0} pending), '
+               f'{db.session.query(func.count(Attendance.id)).scalar() + archived} attendance records '
+               f'({archived} archived), '
+               f'{db.session.query(func.count(LeaveRequest.id)).scalar()} leave requests')
+    for title, header, rows in (('Pending users', USER_HEADER, user_rows(approved=False, limit=limit)),
+                                ('Latest attendance', ATTENDANCE_HEADER, attendance_rows(limit=limit)),
+                                ('Latest leave requests', LEAVE_HEADER, leave_rows(limit=limit))):
+        click.echo(f'\n[{title}]')
+        write(header, rows)
+
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(summary_cli)
+    app.cli.add_command(attendance_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(inspect_cli)
@@ -13,3 +13,80 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + db_path
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Schema creation at startup (see bootstrap.py): auto, always or never
+    DB_BOOTSTRAP = os.environ.get('DB_BOOTSTRAP', 'auto')
+
+    # Engine tuning (see dbengine.EngineTuning). SQLite: WAL journaling and a
+    # busy timeout in ms; other databases: connection pool sizing.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+    # Per-request SQL query counting (see instrumentation.QueryCounter)
+    QUERY_COUNT_ENABLED = os.environ.get('QUERY_COUNT_ENABLED') == '1'
+    QUERY_BUDGET_RAISE = False
+    QUERY_BUDGETS = {
+        'admin.dashboard': 7,
+        'admin.view_attendance': 7,
+        'admin.attendance_report': 6,
+        'admin.manage_leaves': 3,
+        'admin.manage_users': 3,
+        'admin.dashboard_stats': 3,
+        'user.dashboard': 8,
+        'user.attendance_history': 4,
+        'api.attendance_list': 2,
+        'api.logs': 2,
+        'api.stats': 6,
+    }
+
+    # Request profiling (see instrumentation.RequestProfiler): Server-Timing
+    # headers, /admin/metrics, and cProfile dumps of sampled slow requests
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_SLOW_MS = int(os.environ.get('PROFILE_SLOW_MS', 500))
+    METRICS_API_TOKEN = os.environ.get('METRICS_API_TOKEN')
+
+    # Result cache for dashboards and reports (see cache.Cache)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # memory, redis or null
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = 2048
+
+    # Password hashing (see passwords.PasswordHasher): any werkzeug method string
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+    # Per-process cache of logged-in users' identities (seconds; 0 disables)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 30))
+
+    # Live dashboard events (see events.EventHub): 'memory' serves one worker;
+    # 'file' fans events out to every worker on the host through EVENTS_FILE
+    EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'memory')
+    EVENTS_FILE = os.environ.get('EVENTS_FILE') or os.path.join(basedir, 'instance', 'events.jsonl')
+    EVENTS_KEEPALIVE = int(os.environ.get('EVENTS_KEEPALIVE', 15))
+    EVENTS_STREAM_TIMEOUT = int(os.environ.get('EVENTS_STREAM_TIMEOUT', 300))
+
+    # Background jobs (see scheduler.py and jobs.py). With SCHEDULER_ENABLED=1
+    # every web worker polls and the job table's lease picks one to run each
+    # job; or leave it off and run `flask scheduler run` as its own process.
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED') == '1'
+    SCHEDULER_POLL_INTERVAL = int(os.environ.get('SCHEDULER_POLL_INTERVAL', 60))
+    AUTO_CLOSE_POLICY = os.environ.get('AUTO_CLOSE_POLICY', 'shift')  # shift or end_of_day
+    AUTO_CLOSE_SHIFT_HOURS = float(os.environ.get('AUTO_CLOSE_SHIFT_HOURS', 8))
+    WORKDAY_END = os.environ.get('WORKDAY_END', '18:00')
+    ABSENCE_LOOKBACK_DAYS = int(os.environ.get('ABSENCE_LOOKBACK_DAYS', 7))
+
+    # Seconds each worker caches the archive catalog (see archive.py)
+    ARCHIVE_CATALOG_TTL = int(os.environ.get('ARCHIVE_CATALOG_TTL', 60))
+
+    # Lets badge readers post to /admin/api/attendance/import without a session
+    IMPORT_API_TOKEN = os.environ.get('IMPORT_API_TOKEN')
+
+    # Working-day calendar: Monday=0 ... Sunday=6, holidays as YYYY-MM-DD
+    WORK_WEEKDAYS = (0, 1, 2, 3, 4)
+    HOLIDAYS = [day for day in os.environ.get('HOLIDAYS', '').split(',') if day]
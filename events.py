@@ -0,0 +1,209 @@
+"""Live events for the admin dashboard.
+
+Write paths call :meth:`EventHub.publish` after they commit (a check-in, a
+leave decision, a user approval...). The hub attaches the current dashboard
+counters -- one query per event, however many dashboards are open -- and
+fans the event out to every subscriber, which ``/admin/events`` streams to
+browsers as Server-Sent Events. An idle dashboard costs no queries.
+
+Subscribers only see events published in their own process unless a shared
+broker is configured:
+
+* ``memory`` (default): in-process only; fine for one worker.
+* ``file``: events are appended to ``EVENTS_FILE`` and every worker tails
+  it, a local stand-in for a real pub/sub server that makes several
+  gunicorn workers on one host see each other's events.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, hub, maxsize=100):
+        self.hub = hub
+        self.queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A stalled client drops its oldest events rather than blocking publishers
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(event)
+
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class MemoryBroker:
+    def __init__(self, deliver):
+        self.deliver = deliver
+
+    def send(self, event):
+        self.deliver(event)
+
+    def close(self):
+        pass
+
+
+class FileBroker:
+    """Cross-process fan-out through an append-only JSON-lines file."""
+
+    def __init__(self, deliver, path, poll_interval=0.5, max_bytes=1024 * 1024):
+        self.deliver = deliver
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_bytes = max_bytes
+        self._offset = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def send(self, event):
+        line = (json.dumps(event, default=str) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size > self.max_bytes:
+                # Tailers notice the file shrinking and start again from the top
+                os.ftruncate(fd, 0)
+            os.write(fd, line)  # one O_APPEND write per event keeps lines whole
+        finally:
+            os.close(fd)
+        self.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                try:
+                    self._offset = os.path.getsize(self.path)
+                except OSError:
+                    self._offset = 0
+                self._thread = threading.Thread(target=self._tail, name='events-tail', daemon=True)
+                self._thread.start()
+
+    def _tail(self):
+        buffer = b''
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                continue
+            if size < self._offset:
+                self._offset, buffer = 0, b''
+            if size == self._offset:
+                continue
+            with open(self.path, 'rb') as handle:
+                handle.seek(self._offset)
+                chunk = handle.read(size - self._offset)
+            self._offset += len(chunk)
+            *lines, buffer = (buffer + chunk).split(b'\n')
+            for line in lines:
+                try:
+                    self.deliver(json.loads(line))
+                except ValueError:
+                    logger.warning('Skipping malformed event line in %s', self.path)
+
+    def close(self):
+        self._stopped.set()
+
+
+class EventHub:
+    def __init__(self, app=None):
+        self.subscribers = set()
+        self.recent = deque(maxlen=100)
+        self.broker = MemoryBroker(self._deliver)
+        self.counters = None
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, counters=None):
+        app.config.setdefault('EVENTS_BROKER', 'memory')
+        app.config.setdefault('EVENTS_FILE', os.path.join(app.instance_path, 'events.jsonl'))
+        app.config.setdefault('EVENTS_POLL_INTERVAL', 0.5)
+        app.config.setdefault('EVENTS_KEEPALIVE', 15)
+        app.config.setdefault('EVENTS_STREAM_TIMEOUT', 300)
+
+        self.broker.close()
+        broker = app.config['EVENTS_BROKER']
+        if broker == 'memory':
+            self.broker = MemoryBroker(self._deliver)
+        elif broker == 'file':
+            self.broker = FileBroker(self._deliver, app.config['EVENTS_FILE'],
+                                     app.config['EVENTS_POLL_INTERVAL'])
+        else:
+            raise ValueError(f'Unknown EVENTS_BROKER {broker!r}')
+        self.counters = counters
+        app.extensions['events'] = self
+
+    def publish(self, type_, data=None):
+        """Announce ``type_`` with a JSON-serialisable ``data`` dict.
+
+        Call after the change is committed. Failures are logged, never
+        raised: a dashboard update must not break the write that caused it.
+        """
+        try:
+            event = {
+                'id': f'{time.time_ns()}-{os.getpid()}-{next(self._sequence)}',
+                'type': type_,
+                'data': data or {},
+            }
+            if self.counters is not None and self._has_audience():
+                event['counters'] = self.counters()
+            self.broker.send(event)
+        except Exception:
+            logger.exception('Could not publish %s event', type_)
+
+    def _has_audience(self):
+        # Only a shared broker can have listeners in other processes
+        return bool(self.subscribers) or not isinstance(self.broker, MemoryBroker)
+
+    def _deliver(self, event):
+        with self._lock:
+            self.recent.append(event)
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def subscribe(self, last_event_id=None):
+        """A new :class:`Subscription`, pre-loaded with the events after
+        ``last_event_id`` if they are still in the replay buffer."""
+        if hasattr(self.broker, 'start'):
+            self.broker.start()
+        subscription = Subscription(self)
+        with self._lock:
+            if last_event_id:
+                ids = [event['id'] for event in self.recent]
+                if last_event_id in ids:
+                    for event in list(self.recent)[ids.index(last_event_id) + 1:]:
+                        subscription.put(event)
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscribers.discard(subscription)
+
+
+def format_sse(event):
+    payload = dict(event['data'], counters=event.get('counters'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(payload, default=str)}\n\n"
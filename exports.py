@@ -0,0 +1,170 @@
+"""Streaming CSV/XLSX exports.
+
+Rows are read with ``yield_per`` so the database driver hands them over in
+fixed-size batches (a server-side cursor on Postgres), and are written out
+as they arrive; no export ever holds more than one batch of rows in memory.
+"""
+import csv
+import io
+import tempfile
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+from app import db
+from models import User, Attendance
+from archive import attendance_entity
+from reports import _stats_columns
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+ATTENDANCE_HEADER = ['Date', 'Username', 'Employee', 'Department', 'Check In',
+                     'Check Out', 'Working Hours', 'Status', 'Notes']
+REPORT_HEADER = ['Year', 'Month', 'Username', 'Employee', 'Department',
+                 'Total Days', 'Present Days', 'Late Days', 'Total Hours']
+
+
+def _filtered(query, attendance, department=None, status=None):
+    if department:
+        query = query.filter(User.department == department)
+    if status:
+        query = query.filter(attendance.status == status)
+    return query
+
+
+def attendance_rows(start, end, department=None, status=None, batch_size=BATCH_SIZE):
+    """Attendance rows for [start, end), oldest first."""
+    attendance = attendance_entity(start, end)
+    query = db.session.query(
+        attendance.date, User.username, User.full_name, User.department,
+        attendance.check_in, attendance.check_out, attendance.working_hours,
+        attendance.status, attendance.notes
+    ).join(User, User.id == attendance.user_id)\
+        .filter(attendance.date >= start, attendance.date < end)
+    query = _filtered(query, attendance, department, status)\
+        .order_by(attendance.date, attendance.user_id)
+    for row in query.execution_options(yield_per=batch_size):
+        yield tuple(row)
+
+
+def report_rows(start, end, department=None, batch_size=BATCH_SIZE):
+    """Per-employee, per-month totals for [start, end)."""
+    attendance = attendance_entity(start, end)
+    year = db.extract('year', attendance.date)
+    month = db.extract('month', attendance.date)
+    query = db.session.query(
+        year, month, User.username, User.full_name, User.department,
+        *_stats_columns(attendance)[:3],
+        Attendance.round_hours(db.func.coalesce(db.func.sum(attendance.working_hours), 0)),
+    ).join(User, User.id == attendance.user_id)\
+        .filter(attendance.date >= start, attendance.date < end)
+    query = _filtered(query, attendance, department)\
+        .group_by(year, month, User.id, User.username, User.full_name, User.department)\
+        .order_by(year, month, User.full_name)
+    for row in query.execution_options(yield_per=batch_size):
+        yield (int(row[0]), int(row[1])) + tuple(row[2:])
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def csv_stream(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([_cell_text(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _column_name(index):
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def _xlsx_row(number, values):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column_name(index)}{number}'
+        value = _cell_text(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+        else:
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'),
+}
+
+
+def xlsx_stream(header, rows, sheet_name='Export'):
+    """Write a single-sheet workbook row by row and stream it back.
+
+    The zip is assembled in a spooled temporary file (kept in memory while
+    small, moved to disk beyond a few MB) because a zip's central
+    directory can only be written once all rows are known.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024) as spool:
+        with zipfile.ZipFile(spool, 'w', zipfile.ZIP_DEFLATED) as workbook:
+            for name, content in _XLSX_PARTS.items():
+                workbook.writestr(name, content)
+            workbook.writestr('xl/workbook.xml', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'))
+            with workbook.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                            b'<sheetData>')
+                sheet.write(_xlsx_row(1, header).encode('utf-8'))
+                for number, row in enumerate(rows, start=2):
+                    sheet.write(_xlsx_row(number, row).encode('utf-8'))
+                sheet.write(b'</sheetData></worksheet>')
+        spool.seek(0)
+        while True:
+            chunk = spool.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+FORMATS = {
+    'csv': ('text/csv', csv_stream),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_stream),
+}
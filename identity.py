@@ -0,0 +1,50 @@
+"""Cached identity for Flask-Login's ``current_user``.
+
+Every authenticated request used to load the full ``User`` row (password
+hash included) just to render the layout. ``models.SessionUser`` carries
+only the columns the auth checks and templates read, and recently seen
+identities are kept in a small in-process LRU with a TTL, so most page
+views cost no identity query at all.
+
+The cache is per process: writes that change a user must call
+:meth:`IdentityCache.invalidate`, and other workers catch up within
+``IDENTITY_CACHE_TTL`` seconds. Code that needs to modify the user loads the
+real row with ``db.session.get(User, current_user.id)``.
+"""
+from cache import MemoryBackend, MISSING
+
+
+class IdentityCache:
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.ttl = 30
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IDENTITY_CACHE_TTL', 30)
+        app.config.setdefault('IDENTITY_CACHE_SIZE', 1024)
+        self.ttl = app.config['IDENTITY_CACHE_TTL']
+        self.backend = MemoryBackend(app.config['IDENTITY_CACHE_SIZE'])
+        app.extensions['identity_cache'] = self
+
+    def load(self, user_id):
+        """The ``SessionUser`` for ``user_id``, or None if it no longer exists."""
+        if self.ttl:
+            identity = self.backend.get(user_id)
+            if identity is not MISSING:
+                return identity
+        from models import User, SessionUser
+        row = User.query.with_entities(*(getattr(User, name) for name in SessionUser.COLUMNS))\
+            .filter(User.id == user_id).first()
+        identity = SessionUser(**row._asdict()) if row else None
+        if self.ttl and identity is not None:
+            self.backend.set(user_id, identity, self.ttl)
+        return identity
+
+    def invalidate(self, *user_ids):
+        for user_id in user_ids:
+            self.backend.delete(user_id)
+
+    def clear(self):
+        self.backend.clear()
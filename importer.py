@@ -0,0 +1,250 @@
+"""Bulk attendance import for badge readers and kiosks.
+
+Each event is ``{"user": <id, username or email>, "timestamp": <ISO 8601>,
+"direction": "in" | "out"}``. Events are folded into one attendance row per
+(user, date): the earliest ``in`` punch becomes the check-in (and decides
+late vs. present with the same 9:30 rule as the web check-in) and the latest
+``out`` punch becomes the check-out. A day the nightly job recorded as
+absent is overwritten by an ``in`` punch; an ``out`` alone cannot revive
+it. Rows are written with executemany inserts/updates in chunked
+transactions, and every input row gets an outcome so one bad punch never
+sinks the batch.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, update, or_
+from sqlalchemy.exc import SQLAlchemyError
+from app import db, event_hub
+from models import User, Attendance
+from summary import apply_deltas, contribution
+from archive import is_archived
+
+CHUNK_SIZE = 1000
+
+DIRECTIONS = {
+    'in': 'in', 'check-in': 'in', 'check_in': 'in', 'checkin': 'in',
+    'out': 'out', 'check-out': 'out', 'check_out': 'out', 'checkout': 'out',
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.errors = []
+
+    def error(self, index, message):
+        self.errors.append({'row': index, 'error': message})
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'duplicates': self.duplicates,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+def parse_json(data):
+    if isinstance(data, (str, bytes)):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = data.get('events', [])
+    if not isinstance(data, list):
+        raise ValueError('expected a list of events or {"events": [...]}')
+    return data
+
+
+def parse_csv(text):
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _parse_timestamp(value):
+    if isinstance(value, datetime):
+        stamp = value
+    else:
+        stamp = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    if stamp.tzinfo is not None:
+        # Attendance stores naive local time, like datetime.now() in check_in
+        stamp = stamp.astimezone().replace(tzinfo=None)
+    return stamp
+
+
+def _normalize(events, result):
+    punches = []
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            result.error(index, 'event must be an object')
+            continue
+        user = str(event.get('user') or '').strip()
+        direction = DIRECTIONS.get(str(event.get('direction') or '').strip().lower())
+        if not user:
+            result.error(index, 'missing user')
+            continue
+        if direction is None:
+            result.error(index, f"direction must be 'in' or 'out', got {event.get('direction')!r}")
+            continue
+        try:
+            stamp = _parse_timestamp(event.get('timestamp'))
+        except (TypeError, ValueError):
+            result.error(index, f"invalid timestamp {event.get('timestamp')!r}")
+            continue
+        punches.append((index, user, stamp, direction))
+    return punches
+
+
+def _resolve_users(keys, batch_size=500):
+    keys = sorted(keys)
+    lookup = {}
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        ids = [int(key) for key in batch if key.isdigit()]
+        names = [key for key in batch if not key.isdigit()]
+        users = User.query.filter(or_(User.id.in_(ids), User.username.in_(names), User.email.in_(names)))\
+            .with_entities(User.id, User.username, User.email, User.department, User.is_approved)
+        for user in users:
+            lookup[str(user.id)] = user
+            lookup[user.username] = user
+            lookup[user.email] = user
+    return lookup
+
+
+def _apply_chunk(groups, result):
+    keys = list(groups)
+    existing = {}
+    user_ids = {user.id for user, _ in keys}
+    days = {day for _, day in keys}
+    for row in Attendance.query.with_entities(
+            Attendance.id, Attendance.user_id, Attendance.date, Attendance.check_in,
+            Attendance.check_out, Attendance.status, Attendance.working_hours)\
+            .filter(Attendance.user_id.in_(user_ids), Attendance.date.in_(days)):
+        existing[(row.user_id, row.date)] = row
+
+    inserts, updates, replacements, outcomes = [], [], [], []
+    deltas = defaultdict(lambda: defaultdict(float))
+    for user, day in keys:
+        punches = groups[(user, day)]
+        ins = [p for p in punches if p[3] == 'in']
+        outs = [p for p in punches if p[3] == 'out']
+        current = existing.get((user.id, day))
+        absence = current if current is not None and current.status == 'absent' else None
+        if absence is not None:
+            current = None  # real punches replace an absence recorded by the nightly job
+        department = user.department or 'General'
+
+        if current is None and not ins:
+            for index, *_ in outs:
+                result.error(index, f'no check-in for {day.isoformat()}')
+            continue
+
+        if current is None:
+            first_in = min(ins, key=lambda p: p[2])
+            check_in = first_in[2]
+            status = Attendance.status_for(check_in)
+            row = {'user_id': user.id, 'date': day, 'check_in': check_in,
+                   'status': status, 'check_out': None, 'working_hours': 0.0, 'notes': ''}
+            inserted = ('inserted' if absence is None else 'updated', [first_in[0]])
+            outcomes.append(inserted)
+            duplicates = [p for p in ins if p is not first_in]
+        else:
+            check_in = current.check_in
+            row = None
+            duplicates = ins
+
+        for index, *_ in duplicates:
+            outcomes.append(('duplicate', [index]))
+
+        valid_outs = []
+        for punch in outs:
+            if punch[2] <= check_in:
+                result.error(punch[0], 'check-out is before check-in')
+            else:
+                valid_outs.append(punch)
+        if valid_outs:
+            last_out = max(valid_outs, key=lambda p: p[2])
+            others = [p[0] for p in valid_outs if p is not last_out]
+            if row is not None:
+                row['check_out'] = last_out[2]
+                row['working_hours'] = Attendance.hours_between(check_in, last_out[2])
+                inserted[1].append(last_out[0])
+            elif current.check_out is None or current.check_out < last_out[2]:
+                hours = Attendance.hours_between(check_in, last_out[2])
+                updates.append({'id': current.id, 'check_out': last_out[2], 'working_hours': hours})
+                outcomes.append(('updated', [last_out[0]]))
+                deltas[(day, department)]['total_hours'] += hours - (current.working_hours or 0)
+            else:
+                others.append(last_out[0])
+            for index in others:
+                outcomes.append(('duplicate', [index]))
+
+        if row is not None:
+            if absence is None:
+                inserts.append(row)
+            else:
+                replacements.append(dict(row, id=absence.id))
+                for name, value in contribution(absence.status, absence.working_hours).items():
+                    deltas[(day, department)][name] -= value
+            for name, value in contribution(row['status'], row['working_hours']).items():
+                deltas[(day, department)][name] += value
+
+    try:
+        if inserts:
+            db.session.execute(insert(Attendance), inserts)
+        if updates:
+            db.session.execute(update(Attendance), updates)
+        if replacements:
+            db.session.execute(update(Attendance), replacements)
+        apply_deltas(db.session, deltas)
+        db.session.commit()
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        message = f'batch failed: {exc.__class__.__name__}'
+        for _, indexes in outcomes:
+            for index in indexes:
+                result.error(index, message)
+        return
+
+    counts = {'inserted': 0, 'updated': 0, 'duplicate': 0}
+    for outcome, indexes in outcomes:
+        counts[outcome] += 1 if outcome != 'duplicate' else len(indexes)
+    result.inserted += counts['inserted']
+    result.updated += counts['updated']
+    result.duplicates += counts['duplicate']
+    if inserts or updates or replacements:
+        # One event per chunk; dashboards refresh their counters from it
+        event_hub.publish('import', {'inserted': counts['inserted'], 'updated': counts['updated'],
+                                     'days': sorted({day.isoformat() for day, _ in deltas})})
+
+
+def import_events(events, chunk_size=CHUNK_SIZE):
+    """Apply ``events`` and return an :class:`ImportResult`."""
+    result = ImportResult()
+    punches = _normalize(events, result)
+    users = _resolve_users({user for _, user, _, _ in punches})
+
+    groups = defaultdict(list)
+    for punch in punches:
+        user = users.get(punch[1])
+        if user is None:
+            result.error(punch[0], f'unknown user {punch[1]!r}')
+        elif not user.is_approved:
+            result.error(punch[0], f'user {punch[1]!r} is not approved')
+        elif is_archived(punch[2].date()):
+            result.error(punch[0], f'{punch[2].date().isoformat()} is archived; restore it first')
+        else:
+            groups[(user, punch[2].date())].append(punch)
+
+    keys = sorted(groups, key=lambda key: (key[1], key[0].id))
+    for start in range(0, len(keys), chunk_size):
+        chunk = {key: groups[key] for key in keys[start:start + chunk_size]}
+        _apply_chunk(chunk, result)
+
+    result.errors.sort(key=lambda error: error['row'])
+    return result
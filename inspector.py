@@ -0,0 +1,175 @@
+"""Read-only views of the database for ``flask inspect`` (and view_db.py).
+
+Queries go through the app's models and indexes -- attendance newest first
+by ``check_in`` with the user or date range leading, leave requests by
+``created_at`` within a status or user -- and are read with ``yield_per``,
+so even an unbounded listing holds one batch in memory and prints its first
+line as soon as the first batch arrives.
+
+Output is an aligned table (column widths taken from the first batch, wider
+values truncated), CSV, or JSON Lines (one object per row).
+"""
+import json
+import sys
+from datetime import date, datetime
+from sqlalchemy import or_
+from app import db
+from models import User, LeaveRequest
+from archive import attendance_entity
+from exports import csv_stream
+
+BATCH_SIZE = 1000
+MAX_WIDTH = 40
+
+USER_HEADER = ['ID', 'Username', 'Employee', 'Email', 'Role', 'Department', 'Approved', 'Joined']
+ATTENDANCE_HEADER = ['Date', 'Username', 'Employee', 'Department', 'Check In',
+                     'Check Out', 'Working Hours', 'Status']
+LEAVE_HEADER = ['ID', 'Username', 'Employee', 'Type', 'Start', 'End', 'Status', 'Requested']
+
+
+class UnknownUser(LookupError):
+    pass
+
+
+def resolve_user(key):
+    """User id for an id, username or email."""
+    condition = [User.username == key, User.email == key]
+    if key.isdigit():
+        condition.append(User.id == int(key))
+    user_id = db.session.query(User.id).filter(or_(*condition)).order_by(User.id).limit(1).scalar()
+    if user_id is None:
+        raise UnknownUser(key)
+    return user_id
+
+
+def _stream(query, limit, batch_size):
+    if limit is not None:
+        query = query.limit(limit)
+    for row in query.execution_options(yield_per=batch_size):
+        yield tuple(row)
+
+
+def user_rows(role=None, department=None, approved=None, search=None, limit=None, batch_size=BATCH_SIZE):
+    query = db.session.query(
+        User.id, User.username, User.full_name, User.email, User.role,
+        User.department, User.is_approved, User.created_at)
+    if role:
+        query = query.filter(User.role == role)
+    if approved is not None:
+        query = query.filter(User.is_approved == approved)
+    if department:
+        query = query.filter(User.department == department)
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(User.username.ilike(pattern), User.full_name.ilike(pattern),
+                                 User.email.ilike(pattern)))
+    return _stream(query.order_by(User.id), limit, batch_size)
+
+
+def attendance_rows(start=None, end=None, user_id=None, department=None, status=None,
+                    limit=None, batch_size=BATCH_SIZE):
+    """Attendance in [start, end), newest check-in first, archive included."""
+    attendance = attendance_entity(start, end, [user_id] if user_id is not None else None)
+    query = db.session.query(
+        attendance.date, User.username, User.full_name, User.department,
+        attendance.check_in, attendance.check_out, attendance.working_hours, attendance.status
+    ).join(User, User.id == attendance.user_id)
+    if user_id is not None:
+        query = query.filter(attendance.user_id == user_id)
+    if start is not None:
+        query = query.filter(attendance.date >= start)
+    if end is not None:
+        query = query.filter(attendance.date < end)
+    if department:
+        query = query.filter(User.department == department)
+    if status:
+        query = query.filter(attendance.status == status)
+    return _stream(query.order_by(attendance.check_in.desc()), limit, batch_size)
+
+
+def leave_rows(start=None, end=None, user_id=None, department=None, status=None,
+               limit=None, batch_size=BATCH_SIZE):
+    """Leave requests overlapping [start, end), newest request first."""
+    query = db.session.query(
+        LeaveRequest.id, User.username, User.full_name, LeaveRequest.leave_type,
+        LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status, LeaveRequest.created_at
+    ).join(User, User.id == LeaveRequest.user_id)
+    if user_id is not None:
+        query = query.filter(LeaveRequest.user_id == user_id)
+    if status:
+        query = query.filter(LeaveRequest.status == status)
+    if start is not None:
+        query = query.filter(LeaveRequest.end_date >= start)
+    if end is not None:
+        query = query.filter(LeaveRequest.start_date < end)
+    if department:
+        query = query.filter(User.department == department)
+    return _stream(query.order_by(LeaveRequest.created_at.desc()), limit, batch_size)
+
+
+def _table_text(value):
+    if isinstance(value, bool):
+        return 'yes' if value else 'no'
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, float):
+        return f'{value:g}'
+    value = str(value)
+    return value if len(value) <= MAX_WIDTH else value[:MAX_WIDTH - 1] + '~'
+
+
+def table_stream(header, rows, batch_size=BATCH_SIZE):
+    """Aligned text, sized to the first ``batch_size`` rows."""
+    first = []
+    for row in rows:
+        first.append([_table_text(value) for value in row])
+        if len(first) >= batch_size:
+            break
+    widths = [max([len(title)] + [len(row[index]) for row in first]) for index, title in enumerate(header)]
+
+    def line(values):
+        return '  '.join(value.ljust(width)[:width] for value, width in zip(values, widths)).rstrip() + '\n'
+
+    yield line(header)
+    yield line(['-' * width for width in widths])
+    for row in first:
+        yield line(row)
+    for row in rows:
+        yield line([_table_text(value) for value in row])
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def json_stream(header, rows):
+    keys = [title.lower().replace(' ', '_') for title in header]
+    for row in rows:
+        yield json.dumps(dict(zip(keys, map(_json_value, row)))) + '\n'
+
+
+FORMATS = {
+    'table': table_stream,
+    'csv': csv_stream,
+    'json': json_stream,
+}
+
+
+def write(header, rows, fmt='table', out=None):
+    """Write ``rows`` as they arrive; returns how many were written."""
+    out = out or sys.stdout
+    counted = [0]
+
+    def counting():
+        for row in rows:
+            counted[0] += 1
+            yield row
+
+    for chunk in FORMATS[fmt](header, counting()):
+        out.write(chunk)
+    out.flush()
+    return counted[0]
@@ -0,0 +1,307 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from flask import current_app, g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_count' in g:
+        g.query_count += 1
+
+
+class count_queries:
+    """Count the SQL statements executed inside a ``with`` block.
+
+    Works outside a request too, which makes it handy for scripts and
+    benchmarks::
+
+        with count_queries() as counter:
+            client.get('/admin/attendance')
+        print(counter.count)
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+class QueryCounter:
+    """Per-request SQL query counting with optional per-endpoint budgets.
+
+    Enabled with ``QUERY_COUNT_ENABLED``. Every request logs its query count
+    and returns it in an ``X-Query-Count`` header. ``QUERY_BUDGETS`` maps an
+    endpoint name to the maximum number of queries it may issue; going over
+    logs a warning, or raises ``QueryBudgetExceeded`` when
+    ``QUERY_BUDGET_RAISE`` is set (useful under ``TESTING``).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_COUNT_ENABLED', False)
+        app.config.setdefault('QUERY_BUDGETS', {})
+        app.config.setdefault('QUERY_BUDGET_RAISE', False)
+
+        if not app.config['QUERY_COUNT_ENABLED']:
+            return
+
+        if not event.contains(Engine, 'before_cursor_execute', _count_query):
+            event.listen(Engine, 'before_cursor_execute', _count_query)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        g.query_count = 0
+
+    def _finish(self, response):
+        count = g.pop('query_count', 0)
+        endpoint = request.endpoint
+        response.headers['X-Query-Count'] = str(count)
+        logger.debug('%s issued %d queries', endpoint, count)
+
+        budget = current_app.config['QUERY_BUDGETS'].get(endpoint)
+        if budget is not None and count > budget:
+            message = f'{endpoint} issued {count} queries (budget {budget})'
+            if current_app.config['QUERY_BUDGET_RAISE']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+def _profiling():
+    return g.get('profile') if has_request_context() else None
+
+
+class span:
+    """Add the time spent in a ``with`` block to the current request's
+    profile under ``name`` (e.g. ``password``). A no-op unless
+    ``PROFILING_ENABLED`` is on and a request is being handled."""
+
+    def __init__(self, name):
+        self.name = name
+        self.profile = None
+
+    def __enter__(self):
+        self.profile = _profiling()
+        if self.profile is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RequestProfile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = defaultdict(float)
+        self.queries = 0
+        self.profiler = None
+        self._started = defaultdict(list)
+
+    def add(self, name, seconds):
+        self.spans[name] += seconds
+
+    def push(self, name):
+        self._started[name].append(time.perf_counter())
+
+    def pop(self, name):
+        if self._started[name]:
+            self.add(name, time.perf_counter() - self._started[name].pop())
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    profile = _profiling()
+    if profile is not None:
+        profile.queries += 1
+        profile.push('db')
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    profile = _profiling()
+    if profile is not None:
+        profile.pop('db')
+
+
+def _before_template(sender, template, context, **extra):
+    profile = _profiling()
+    if profile is not None:
+        profile.push('template')
+
+
+def _after_template(sender, template, context, **extra):
+    profile = _profiling()
+    if profile is not None:
+        profile.pop('template')
+
+
+class Metrics:
+    """Per-endpoint request metrics, rendered in Prometheus text format.
+
+    Counts live in process memory, so each worker process exposes its own
+    series; scrape every worker (or aggregate with the ``instance`` label).
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.buckets = defaultdict(lambda: [0] * len(self.BUCKETS))
+            self.duration = defaultdict(float)
+            self.spans = defaultdict(float)
+            self.queries = defaultdict(int)
+
+    def observe(self, endpoint, status, total, spans, queries):
+        with self._lock:
+            self.requests[(endpoint, status)] += 1
+            self.duration[endpoint] += total
+            counts = self.buckets[endpoint]
+            for index, bound in enumerate(self.BUCKETS):
+                if total <= bound:
+                    counts[index] += 1
+            for name, seconds in spans.items():
+                self.spans[(endpoint, name)] += seconds
+            self.queries[endpoint] += queries
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP attendease_requests_total Requests handled, by endpoint and status.',
+                '# TYPE attendease_requests_total counter',
+            ]
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'attendease_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines += [
+                '# HELP attendease_request_duration_seconds Wall time per request.',
+                '# TYPE attendease_request_duration_seconds histogram',
+            ]
+            for endpoint in sorted(self.duration):
+                counts = self.buckets[endpoint]
+                for bound, count in zip(self.BUCKETS, counts):
+                    lines.append(f'attendease_request_duration_seconds_bucket'
+                                 f'{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                total = sum(n for (name, _), n in self.requests.items() if name == endpoint)
+                lines.append(f'attendease_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {total}')
+                lines.append(f'attendease_request_duration_seconds_sum{{endpoint="{endpoint}"}} '
+                             f'{self.duration[endpoint]:.6f}')
+                lines.append(f'attendease_request_duration_seconds_count{{endpoint="{endpoint}"}} {total}')
+
+            lines += [
+                '# HELP attendease_span_seconds_total Time spent in db, template and other spans.',
+                '# TYPE attendease_span_seconds_total counter',
+            ]
+            for (endpoint, name), seconds in sorted(self.spans.items()):
+                lines.append(f'attendease_span_seconds_total{{endpoint="{endpoint}",span="{name}"}} {seconds:.6f}')
+
+            lines += [
+                '# HELP attendease_db_queries_total SQL statements executed.',
+                '# TYPE attendease_db_queries_total counter',
+            ]
+            for endpoint, count in sorted(self.queries.items()):
+                lines.append(f'attendease_db_queries_total{{endpoint="{endpoint}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestProfiler:
+    """Opt-in per-request timing: DB time and query count, template render
+    time, named :class:`span` blocks and the total.
+
+    With ``PROFILING_ENABLED`` every response carries a ``Server-Timing``
+    header and the numbers are aggregated into :attr:`metrics` (served at
+    ``/admin/metrics``). ``PROFILE_SAMPLE_RATE`` runs cProfile on that
+    fraction of requests and writes a ``.prof`` file to ``PROFILE_DIR`` for
+    any sampled request slower than ``PROFILE_SLOW_MS``. When disabled
+    nothing is registered, so the cost is nil.
+    """
+
+    def __init__(self, app=None):
+        self.metrics = Metrics()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILING_ENABLED', False)
+        app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+        app.config.setdefault('PROFILE_SLOW_MS', 500)
+        app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+        app.extensions['profiler'] = self
+
+        if not app.config['PROFILING_ENABLED']:
+            return
+
+        for name, listener in (('before_cursor_execute', _before_cursor),
+                               ('after_cursor_execute', _after_cursor)):
+            if not event.contains(Engine, name, listener):
+                event.listen(Engine, name, listener)
+        before_render_template.connect(_before_template, app)
+        template_rendered.connect(_after_template, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        profile = g.profile = RequestProfile()
+        rate = current_app.config['PROFILE_SAMPLE_RATE']
+        if rate and random.random() < rate:
+            import cProfile
+            profile.profiler = cProfile.Profile()
+            try:
+                profile.profiler.enable()
+            except ValueError:  # another profiler is already active
+                profile.profiler = None
+
+    def _finish(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile.start
+        if profile.profiler is not None:
+            profile.profiler.disable()
+            if total * 1000 >= current_app.config['PROFILE_SLOW_MS']:
+                self._dump(profile.profiler, total)
+
+        endpoint = request.endpoint or 'unknown'
+        timings = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in sorted(profile.spans.items())]
+        timings.append(f'queries;desc="{profile.queries} queries"')
+        timings.append(f'total;dur={total * 1000:.1f}')
+        response.headers['Server-Timing'] = ', '.join(timings)
+        self.metrics.observe(endpoint, response.status_code, total, profile.spans, profile.queries)
+        return response
+
+    def _dump(self, profiler, total):
+        directory = current_app.config['PROFILE_DIR']
+        os.makedirs(directory, exist_ok=True)
+        name = f'{request.endpoint or "unknown"}-{int(time.time() * 1000)}-{int(total * 1000)}ms.prof'
+        path = os.path.join(directory, name)
+        profiler.dump_stats(path)
+        logger.info('Slow request %s took %.0f ms; profile written to %s', request.path, total * 1000, path)
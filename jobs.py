@@ -0,0 +1,109 @@
+"""Built-in nightly jobs (see scheduler.py).
+
+* ``close-open-days``: attendance left without a check-out on a past day is
+  closed according to ``AUTO_CLOSE_POLICY`` -- ``shift`` (check-in plus
+  ``AUTO_CLOSE_SHIFT_HOURS``, capped at midnight) or ``end_of_day``
+  (``WORKDAY_END``) -- and noted as auto-closed.
+* ``record-absences``: for the last ``ABSENCE_LOOKBACK_DAYS`` working days,
+  approved employees with no attendance and no approved leave get an
+  ``absent`` row. Safe to re-run; existing rows are never touched.
+* ``report-snapshot``: precomputes last month's report (snapshots.py).
+"""
+from datetime import datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import exists
+from app import db
+from models import User, Attendance, LeaveRequest
+from scheduler import job
+
+BATCH_SIZE = 500
+AUTO_CLOSED_NOTE = '[auto-closed]'
+ABSENT_NOTE = '[recorded absent]'
+
+
+def close_time(attendance, policy, shift_hours, workday_end):
+    if policy == 'end_of_day':
+        return max(attendance.check_in, datetime.combine(attendance.date, workday_end))
+    if policy == 'shift':
+        midnight = datetime.combine(attendance.date, time.max.replace(microsecond=0))
+        return min(attendance.check_in + timedelta(hours=shift_hours), midnight)
+    raise ValueError(f'Unknown AUTO_CLOSE_POLICY {policy!r}')
+
+
+@job('close-open-days', at='00:15')
+def close_open_days(now):
+    config = current_app.config
+    policy = config['AUTO_CLOSE_POLICY']
+    workday_end = time.fromisoformat(config['WORKDAY_END'])
+    closed = 0
+    while True:
+        # ORM updates, so the daily rollup picks up the new hours
+        batch = Attendance.query.filter(Attendance.check_out.is_(None), Attendance.date < now.date())\
+            .order_by(Attendance.id).limit(BATCH_SIZE).all()
+        if not batch:
+            break
+        for attendance in batch:
+            attendance.check_out = close_time(attendance, policy, config['AUTO_CLOSE_SHIFT_HOURS'], workday_end)
+            attendance.calculate_hours()
+            attendance.notes = f'{attendance.notes} {AUTO_CLOSED_NOTE}'.strip()
+        db.session.commit()
+        closed += len(batch)
+    return {'closed': closed, 'policy': policy}
+
+
+def absentees(day):
+    """``(user_id, department)`` of approved employees who had joined by
+    ``day`` but have neither attendance nor approved leave on it."""
+    return db.session.query(User.id, User.department).filter(
+        User.role == 'user',
+        User.is_approved == True,
+        User.created_at < datetime.combine(day + timedelta(days=1), time.min),
+        ~exists().where(Attendance.user_id == User.id, Attendance.date == day),
+        ~exists().where(LeaveRequest.user_id == User.id,
+                        LeaveRequest.status == 'approved',
+                        LeaveRequest.start_date <= day,
+                        LeaveRequest.end_date >= day),
+    ).all()
+
+
+@job('record-absences', at='00:30')
+def record_absences(now):
+    from archive import is_archived
+    from summary import apply_deltas
+    from workcalendar import working_mask
+    end = now.date()
+    start = end - timedelta(days=current_app.config['ABSENCE_LOOKBACK_DAYS'])
+    mask = working_mask(start, end)
+    table = Attendance.__table__
+    recorded = 0
+    for offset in range((end - start).days):
+        if not mask >> offset & 1:
+            continue
+        day = start + timedelta(days=offset)
+        if is_archived(day):
+            continue
+        rows = absentees(day)
+        if not rows:
+            continue
+        midnight = datetime.combine(day, time.min)
+        db.session.execute(table.insert(), [
+            {'user_id': user_id, 'date': day, 'check_in': midnight, 'check_out': midnight,
+             'status': 'absent', 'working_hours': 0.0, 'notes': ABSENT_NOTE}
+            for user_id, _ in rows])
+        # Core insert: keep the rollup in step by hand
+        deltas = {}
+        for _, department in rows:
+            key = (day, department or 'General')
+            deltas[key] = {'absent_count': deltas.get(key, {}).get('absent_count', 0) + 1,
+                           'total_hours': 0.0}
+        apply_deltas(db.session, deltas)
+        recorded += len(rows)
+    return {'recorded': recorded, 'start': start, 'end': end}
+
+
+@job('report-snapshot', at='01:00')
+def snapshot_last_month(now):
+    from snapshots import store_snapshot
+    last_month = now.date().replace(day=1) - timedelta(days=1)
+    payload = store_snapshot(last_month.year, last_month.month)
+    return {'year': last_month.year, 'month': last_month.month, 'rows': len(payload['report'])}
@@ -0,0 +1,52 @@
+"""daily attendance summary
+
+Revision ID: 44090f4b9270
+Revises: 88a6f25a9d0d
+Create Date: 2026-10-18 11:05:47.302194
+
+Creates the per (date, department) rollup and backfills it from the
+existing attendance history.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '44090f4b9270'
+down_revision = '88a6f25a9d0d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'daily_attendance_summary' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('daily_attendance_summary',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('department', sa.String(length=100), nullable=False),
+            sa.Column('present_count', sa.Integer(), nullable=False),
+            sa.Column('late_count', sa.Integer(), nullable=False),
+            sa.Column('absent_count', sa.Integer(), nullable=False),
+            sa.Column('total_hours', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('date', 'department', name='uq_daily_summary_date_department')
+        )
+
+    op.execute('DELETE FROM daily_attendance_summary')
+    op.execute(
+        "INSERT INTO daily_attendance_summary "
+        "(date, department, present_count, late_count, absent_count, total_hours) "
+        "SELECT a.date, COALESCE(u.department, 'General'), "
+        "SUM(CASE WHEN a.status IN ('late', 'absent') THEN 0 ELSE 1 END), "
+        "SUM(CASE WHEN a.status = 'late' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.status = 'absent' THEN 1 ELSE 0 END), "
+        "ROUND(CAST(COALESCE(SUM(a.working_hours), 0) AS NUMERIC), 2) "
+        "FROM attendance a JOIN users u ON u.id = a.user_id "
+        "WHERE a.date IS NOT NULL "
+        "GROUP BY a.date, COALESCE(u.department, 'General')"
+    )
+
+
+def downgrade():
+    op.drop_table('daily_attendance_summary')
@@ -0,0 +1,30 @@
+"""leave interval index
+
+Revision ID: 4c3c240a98d4
+Revises: 44090f4b9270
+Create Date: 2026-10-18 13:48:21.574380
+
+Index behind the working-day calendar's overlap lookups on approved
+leave ranges.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c3c240a98d4'
+down_revision = '44090f4b9270'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('leave_requests')}
+    if 'ix_leave_requests_user_range' not in existing:
+        op.create_index('ix_leave_requests_user_range', 'leave_requests',
+                        ['user_id', 'start_date', 'end_date', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_leave_requests_user_range', table_name='leave_requests')
@@ -0,0 +1,85 @@
+"""attendance, leave and user indexes
+
+Revision ID: 88a6f25a9d0d
+Revises: de7d9677b8e6
+Create Date: 2026-10-18 09:31:02.660917
+
+Adds the indexes behind the hot query paths and a unique (user_id, date)
+index on attendance so two concurrent check-ins cannot both insert a row.
+Duplicate (user_id, date) rows left over from that race are merged before
+the unique index is built: the row with the lowest id keeps the earliest
+check-in (and its status), the latest check-out, recomputed hours and every
+note; the others are deleted. Each merge is logged.
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# revision identifiers, used by Alembic.
+revision = '88a6f25a9d0d'
+down_revision = 'de7d9677b8e6'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('attendance', 'uq_attendance_user_date', ['user_id', 'date'], True),
+    ('attendance', 'ix_attendance_user_check_in', ['user_id', 'check_in'], False),
+    ('attendance', 'ix_attendance_date_check_in', ['date', 'check_in'], False),
+    ('attendance', 'ix_attendance_check_in', ['check_in'], False),
+    ('leave_requests', 'ix_leave_requests_status_created_at', ['status', 'created_at'], False),
+    ('leave_requests', 'ix_leave_requests_user_created_at', ['user_id', 'created_at'], False),
+    ('users', 'ix_users_role_is_approved', ['role', 'is_approved'], False),
+]
+
+
+def _existing_indexes(table):
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _merge_duplicates():
+    bind = op.get_bind()
+    attendance = sa.table(
+        'attendance', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+        sa.column('date', sa.Date), sa.column('check_in', sa.DateTime), sa.column('check_out', sa.DateTime),
+        sa.column('status', sa.String), sa.column('working_hours', sa.Float), sa.column('notes', sa.Text))
+    groups = bind.execute(
+        sa.select(attendance.c.user_id, attendance.c.date)
+        .where(attendance.c.date.isnot(None))
+        .group_by(attendance.c.user_id, attendance.c.date)
+        .having(sa.func.count() > 1)).all()
+    for user_id, day in groups:
+        rows = bind.execute(
+            sa.select(attendance).where(attendance.c.user_id == user_id, attendance.c.date == day)
+            .order_by(attendance.c.id)).all()
+        keep, earliest = rows[0], min(rows, key=lambda row: (row.check_in is None, row.check_in))
+        check_outs = [row.check_out for row in rows if row.check_out is not None]
+        check_out = max(check_outs) if check_outs else None
+        hours = round((check_out - earliest.check_in).total_seconds() / 3600, 2) \
+            if check_out and earliest.check_in else keep.working_hours
+        notes = ' '.join(dict.fromkeys(row.notes for row in rows if row.notes))
+        bind.execute(attendance.update().where(attendance.c.id == keep.id).values(
+            check_in=earliest.check_in, check_out=check_out, status=earliest.status,
+            working_hours=hours, notes=notes))
+        dropped = [row.id for row in rows[1:]]
+        bind.execute(attendance.delete().where(attendance.c.id.in_(dropped)))
+        logger.warning('Merged duplicate attendance for user %s on %s into id %s (removed ids %s)',
+                       user_id, day, keep.id, ', '.join(map(str, dropped)))
+
+
+def upgrade():
+    _merge_duplicates()
+
+    for table, name, columns, unique in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for table, name, columns, unique in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,52 @@
+"""scheduler tables
+
+Revision ID: b7e2f0c41d95
+Revises: 4c3c240a98d4
+Create Date: 2026-10-18 16:02:11.418903
+
+Run state for the background job scheduler and the report snapshots its
+nightly job precomputes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2f0c41d95'
+down_revision = '4c3c240a98d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    if 'scheduled_jobs' not in existing:
+        op.create_table('scheduled_jobs',
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('next_run_at', sa.DateTime(), nullable=False),
+            sa.Column('locked_by', sa.String(length=128), nullable=True),
+            sa.Column('locked_until', sa.DateTime(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_started_at', sa.DateTime(), nullable=True),
+            sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+            sa.Column('last_status', sa.String(length=20), nullable=True),
+            sa.Column('last_result', sa.Text(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+    if 'report_snapshots' not in existing:
+        op.create_table('report_snapshots',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('computed_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('year', 'month', name='uq_report_snapshots_year_month')
+        )
+
+
+def downgrade():
+    op.drop_table('report_snapshots')
+    op.drop_table('scheduled_jobs')
@@ -0,0 +1,35 @@
+"""attendance archives
+
+Revision ID: d41c8a7f2e63
+Revises: b7e2f0c41d95
+Create Date: 2026-10-18 18:27:45.902117
+
+Catalog of the per-year attendance archive tables. The archive tables
+themselves are created on demand by `flask archive run`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c8a7f2e63'
+down_revision = 'b7e2f0c41d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'attendance_archives' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('attendance_archives',
+            sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('first_date', sa.Date(), nullable=False),
+            sa.Column('last_date', sa.Date(), nullable=False),
+            sa.Column('row_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('year')
+        )
+
+
+def downgrade():
+    op.drop_table('attendance_archives')
@@ -0,0 +1,78 @@
+"""initial schema
+
+Revision ID: de7d9677b8e6
+Revises: 
+Create Date: 2026-10-18 09:12:40.118532
+
+Databases created before migrations were introduced already have these
+tables (from ``db.create_all()``), so each table is only created when it
+is missing. That lets ``flask db upgrade`` run on both fresh and existing
+databases without a manual ``flask db stamp``.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'de7d9677b8e6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'users' not in existing:
+        op.create_table('users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=256), nullable=False),
+            sa.Column('full_name', sa.String(length=150), nullable=False),
+            sa.Column('role', sa.String(length=20), nullable=True),
+            sa.Column('department', sa.String(length=100), nullable=True),
+            sa.Column('phone', sa.String(length=20), nullable=True),
+            sa.Column('is_approved', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+
+    if 'attendance' not in existing:
+        op.create_table('attendance',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('check_in', sa.DateTime(), nullable=False),
+            sa.Column('check_out', sa.DateTime(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('working_hours', sa.Float(), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('date', sa.Date(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'leave_requests' not in existing:
+        op.create_table('leave_requests',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('leave_type', sa.String(length=50), nullable=False),
+            sa.Column('start_date', sa.Date(), nullable=False),
+            sa.Column('end_date', sa.Date(), nullable=False),
+            sa.Column('reason', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('admin_remarks', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('leave_requests')
+    op.drop_table('attendance')
+    op.drop_table('users')
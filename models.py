@@ -1,14 +1,17 @@
 from datetime import datetime, date
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
-from app import db, login_manager
+from app import db, login_manager, identity_cache, password_hasher
+from instrumentation import span
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return identity_cache.load(int(user_id))
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_is_approved', 'role', 'is_approved'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -24,10 +27,16 @@ class User(UserMixin, db.Model):
     leave_requests = db.relationship('LeaveRequest', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        with span('password'):
+            self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        with span('password'):
+            matches, new_hash = password_hasher.verify(self.password_hash, password)
+        if new_hash:
+            # Hashing parameters changed since this one was stored; the caller's commit saves it
+            self.password_hash = new_hash
+        return matches
     
     def is_admin(self):
         return self.role == 'admin'
@@ -36,37 +45,42 @@ class User(UserMixin, db.Model):
         today = date.today()
         return Attendance.query.filter(
             Attendance.user_id == self.id,
-            db.func.date(Attendance.check_in) == today
+            Attendance.date == today
         ).first()
 
     def get_month_stats(self, year=None, month=None):
+        from reports import user_month_stats
         if not year:
             year = date.today().year
         if not month:
             month = date.today().month
-        
-        records = Attendance.query.filter(
-            Attendance.user_id == self.id,
-            db.extract('year', Attendance.check_in) == year,
-            db.extract('month', Attendance.check_in) == month
-        ).all()
-        
-        total_days = len(records)
-        present_days = sum(1 for r in records if r.status == 'present')
-        late_days = sum(1 for r in records if r.status == 'late')
-        total_hours = sum(r.working_hours or 0 for r in records)
-        
-        return {
-            'total_days': total_days,
-            'present_days': present_days,
-            'late_days': late_days,
-            'absent_days': 0,
-            'total_hours': round(total_hours, 2)
-        }
+        return user_month_stats(self.id, year, month)
+
+
+class SessionUser(UserMixin):
+    """The slim ``current_user``: the columns auth and the layout need, no
+    password hash, no session state. Load the ``User`` to change anything."""
+
+    COLUMNS = ('id', 'username', 'email', 'full_name', 'role', 'department', 'phone',
+               'is_approved', 'created_at')
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    # These only read the columns above
+    is_admin = User.is_admin
+    get_today_attendance = User.get_today_attendance
+    get_month_stats = User.get_month_stats
 
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        db.Index('uq_attendance_user_date', 'user_id', 'date', unique=True),
+        db.Index('ix_attendance_user_check_in', 'user_id', 'check_in'),
+        db.Index('ix_attendance_date_check_in', 'date', 'check_in'),
+        db.Index('ix_attendance_check_in', 'check_in'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     check_in = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -76,15 +90,37 @@ class Attendance(db.Model):
     notes = db.Column(db.Text, default='')
     date = db.Column(db.Date, default=date.today)
     
+    @staticmethod
+    def status_for(check_in):
+        # Consider late if after 9:30 AM
+        if check_in.hour > 9 or (check_in.hour == 9 and check_in.minute > 30):
+            return 'late'
+        return 'present'
+
+    @staticmethod
+    def hours_between(check_in, check_out):
+        diff = check_out - check_in
+        return round(diff.total_seconds() / 3600, 2)
+
+    @staticmethod
+    def round_hours(expression):
+        """SQL for ``expression`` rounded to 2 places, as a float. Postgres
+        has no round(double precision, int), so round a numeric and cast back."""
+        return db.cast(db.func.round(db.cast(expression, db.Numeric), 2), db.Float)
+
     def calculate_hours(self):
         if self.check_in and self.check_out:
-            diff = self.check_out - self.check_in
-            self.working_hours = round(diff.total_seconds() / 3600, 2)
+            self.working_hours = self.hours_between(self.check_in, self.check_out)
         return self.working_hours
 
 
 class LeaveRequest(db.Model):
     __tablename__ = 'leave_requests'
+    __table_args__ = (
+        db.Index('ix_leave_requests_status_created_at', 'status', 'created_at'),
+        db.Index('ix_leave_requests_user_created_at', 'user_id', 'created_at'),
+        db.Index('ix_leave_requests_user_range', 'user_id', 'start_date', 'end_date', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     leave_type = db.Column(db.String(50), nullable=False)  # sick, casual, vacation
@@ -95,3 +131,55 @@ class LeaveRequest(db.Model):
     admin_remarks = db.Column(db.Text, default='')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DailyAttendanceSummary(db.Model):
+    __tablename__ = 'daily_attendance_summary'
+    __table_args__ = (
+        db.UniqueConstraint('date', 'department', name='uq_daily_summary_date_department'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    department = db.Column(db.String(100), nullable=False)
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+    absent_count = db.Column(db.Integer, nullable=False, default=0)
+    total_hours = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class ScheduledJob(db.Model):
+    """Run state of a background job (see scheduler.py); one row per job."""
+    __tablename__ = 'scheduled_jobs'
+    name = db.Column(db.String(64), primary_key=True)
+    next_run_at = db.Column(db.DateTime, nullable=False)
+    locked_by = db.Column(db.String(128), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_started_at = db.Column(db.DateTime, nullable=True)
+    last_finished_at = db.Column(db.DateTime, nullable=True)
+    last_status = db.Column(db.String(20), nullable=True)  # ok, retrying, failed
+    last_result = db.Column(db.Text, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+
+class ReportSnapshot(db.Model):
+    """A closed month's report, precomputed by the scheduler (see snapshots.py)."""
+    __tablename__ = 'report_snapshots'
+    __table_args__ = (
+        db.UniqueConstraint('year', 'month', name='uq_report_snapshots_year_month'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class AttendanceArchive(db.Model):
+    """Catalog of the per-year ``attendance_archive_<year>`` tables (see archive.py)."""
+    __tablename__ = 'attendance_archives'
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    first_date = db.Column(db.Date, nullable=False)
+    last_date = db.Column(db.Date, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
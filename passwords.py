@@ -0,0 +1,52 @@
+"""Password hashing with configurable parameters and upgrade on login.
+
+``PASSWORD_HASH_METHOD`` is any werkzeug method string (``scrypt``,
+``scrypt:16384:8:1``, ``pbkdf2:sha256:600000``...). Stored hashes made with
+different parameters still verify, and :meth:`PasswordHasher.verify` hands
+back a fresh hash so callers can upgrade them on login.
+
+Hashing runs on the request thread. hashlib's scrypt and pbkdf2 release the
+GIL while they work, so concurrent logins in a threaded worker already use
+several cores; handing the work to a pool and blocking on it would add
+nothing.
+"""
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def _method_of(password_hash):
+    return password_hash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self._method_id = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self._method_id = None
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        return generate_password_hash(password, self.method)
+
+    def method_id(self):
+        """The full method prefix new hashes get, e.g. ``scrypt:32768:8:1``."""
+        if self._method_id is None:
+            self._method_id = _method_of(generate_password_hash('', self.method))
+        return self._method_id
+
+    def needs_rehash(self, password_hash):
+        return _method_of(password_hash) != self.method_id()
+
+    def verify(self, password_hash, password):
+        """Return ``(matches, new_hash)``; ``new_hash`` is set when the
+        password matched but was stored with outdated parameters."""
+        if not password_hash or not check_password_hash(password_hash, password):
+            return False, None
+        if self.needs_rehash(password_hash):
+            return True, self.hash(password)
+        return True, None
@@ -0,0 +1,81 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app import db, event_hub
+from models import Attendance
+
+
+class PunchError(Exception):
+    def __init__(self, message, category='warning'):
+        super().__init__(message)
+        self.message = message
+        self.category = category
+
+
+def check_in(user_id, now=None):
+    now = now or datetime.now()
+    today = now.date()
+    existing = Attendance.query.filter(
+        Attendance.user_id == user_id,
+        Attendance.date == today
+    ).first()
+    
+    if existing:
+        raise PunchError('You have already checked in today.')
+    
+    attendance = Attendance(
+        user_id=user_id,
+        check_in=now,
+        status=Attendance.status_for(now),
+        date=today
+    )
+    db.session.add(attendance)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent check-in won the (user_id, date) unique index
+        db.session.rollback()
+        raise PunchError('You have already checked in today.')
+    return attendance
+
+
+def check_out(user_id, now=None):
+    now = now or datetime.now()
+    attendance = Attendance.query.filter(
+        Attendance.user_id == user_id,
+        Attendance.date == now.date()
+    ).first()
+    
+    if not attendance:
+        raise PunchError('You have not checked in today.')
+    
+    if attendance.check_out:
+        raise PunchError('You have already checked out today.')
+    
+    attendance.check_out = now
+    attendance.calculate_hours()
+    db.session.commit()
+    return attendance
+
+
+def check_in_message(attendance):
+    if attendance.status == 'late':
+        return 'Checked in successfully. Note: You are marked as late.', 'warning'
+    return 'Checked in successfully!', 'success'
+
+
+def check_out_message(attendance):
+    return f'Checked out successfully! Working hours: {attendance.working_hours}h', 'success'
+
+
+def announce(kind, attendance, user):
+    """Push a committed check-in/check-out to live admin dashboards."""
+    event_hub.publish(kind, {
+        'id': attendance.id,
+        'user': user.full_name,
+        'department': user.department,
+        'date': attendance.date.isoformat(),
+        'check_in': attendance.check_in.isoformat() if attendance.check_in else None,
+        'check_out': attendance.check_out.isoformat() if attendance.check_out else None,
+        'working_hours': attendance.working_hours or 0,
+        'status': attendance.status,
+    })
@@ -0,0 +1,219 @@
+from datetime import date, timedelta
+from app import db
+from models import User, Attendance, LeaveRequest, DailyAttendanceSummary
+
+
+def month_range(year, month):
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+
+def _stats_columns(attendance=Attendance):
+    return (
+        # Absences recorded by the nightly job are rows too, but not attended days
+        db.func.count(db.case((attendance.status != 'absent', attendance.id))).label('total_days'),
+        db.func.sum(db.case((attendance.status == 'present', 1), else_=0)).label('present_days'),
+        db.func.sum(db.case((attendance.status == 'late', 1), else_=0)).label('late_days'),
+        db.func.sum(attendance.working_hours).label('total_hours'),
+    )
+
+
+def stats_query(start, end, user_ids=None):
+    """Per-user attendance aggregates over the half-open range [start, end)."""
+    from archive import attendance_entity
+    attendance = attendance_entity(start, end, user_ids)
+    query = db.session.query(attendance.user_id, *_stats_columns(attendance))\
+        .filter(attendance.date >= start, attendance.date < end)
+    if user_ids is not None:
+        query = query.filter(attendance.user_id.in_(user_ids))
+    return query.group_by(attendance.user_id)
+
+
+def stats_dict(row, calendar=None):
+    calendar = calendar or {}
+    if row is None:
+        stats = {'total_days': 0, 'present_days': 0, 'late_days': 0, 'total_hours': 0}
+    else:
+        stats = {
+            'total_days': row.total_days or 0,
+            'present_days': row.present_days or 0,
+            'late_days': row.late_days or 0,
+            'total_hours': round(row.total_hours or 0, 2)
+        }
+    stats['absent_days'] = calendar.get('absent_days', 0)
+    stats['on_leave_days'] = calendar.get('on_leave_days', 0)
+    return stats
+
+
+def user_month_stats(user_id, year, month):
+    from workcalendar import calendar_stats
+    start, end = month_range(year, month)
+    row = stats_query(start, end, user_ids=[user_id]).first()
+    calendar = calendar_stats(start, end, user_ids=[user_id]).get(user_id)
+    return stats_dict(row, calendar)
+
+
+def monthly_report(year, month):
+    """One row per approved employee with their stats for the month.
+
+    Aggregates in a single grouped query joined back onto ``users`` so the
+    page costs the same number of round-trips regardless of headcount;
+    absence and leave days come from the working-day calendar.
+    """
+    from workcalendar import calendar_stats
+    start, end = month_range(year, month)
+    stats = stats_query(start, end).subquery()
+    rows = db.session.query(
+        User.id,
+        User.full_name,
+        User.department,
+        db.func.coalesce(stats.c.total_days, 0).label('total_days'),
+        db.func.coalesce(stats.c.present_days, 0).label('present_days'),
+        db.func.coalesce(stats.c.late_days, 0).label('late_days'),
+        Attendance.round_hours(db.func.coalesce(stats.c.total_hours, 0)).label('total_hours'),
+    ).outerjoin(stats, stats.c.user_id == User.id)\
+        .filter(User.role == 'user', User.is_approved == True)\
+        .order_by(User.full_name)\
+        .all()
+    calendar = calendar_stats(start, end)
+    report = []
+    for row in rows:
+        days = calendar.get(row.id, {})
+        report.append(dict(row._asdict(),
+                           absent_days=days.get('absent_days', 0),
+                           on_leave_days=days.get('on_leave_days', 0)))
+    return report
+
+
+def dashboard_counters(day):
+    """Headline dashboard numbers for ``day`` in a single round-trip."""
+    today = db.session.query(
+        db.func.coalesce(db.func.sum(DailyAttendanceSummary.present_count
+                                     + DailyAttendanceSummary.late_count), 0).label('present'),
+        db.func.coalesce(db.func.sum(DailyAttendanceSummary.late_count), 0).label('late'),
+    ).filter(DailyAttendanceSummary.date == day).subquery()
+    total_users = db.session.query(db.func.count(User.id))\
+        .filter(User.role == 'user', User.is_approved == True)\
+        .scalar_subquery()
+    pending_users = db.session.query(db.func.count(User.id))\
+        .filter(User.role == 'user', User.is_approved == False)\
+        .scalar_subquery()
+    pending_leaves = db.session.query(db.func.count(LeaveRequest.id))\
+        .filter(LeaveRequest.status == 'pending')\
+        .scalar_subquery()
+    return db.session.query(
+        total_users.label('total_users'),
+        pending_users.label('pending_users'),
+        today.c.present,
+        today.c.late,
+        pending_leaves.label('pending_leaves'),
+    ).select_from(today).one()
+
+
+def live_counters(day=None):
+    """The admin dashboard's stat cards, keyed like its template variables."""
+    counters = dashboard_counters(day or date.today())
+    return {
+        'total_users': counters.total_users + counters.pending_users,
+        'today_checkins': counters.present,
+        'pending_users': counters.pending_users,
+        'pending_leaves': counters.pending_leaves,
+    }
+
+
+def daily_checkins(end, days):
+    """Check-in counts for the ``days`` days ending on ``end`` (inclusive).
+
+    Reads the daily rollup, so the cost grows with the number of days and
+    departments rather than the number of attendance rows. Days without
+    any check-ins are filled in with zero.
+    """
+    start = end - timedelta(days=days - 1)
+    summary = DailyAttendanceSummary
+    counts = dict(
+        db.session.query(summary.date,
+                         db.func.sum(summary.present_count + summary.late_count))
+        .filter(summary.date >= start, summary.date <= end)
+        .group_by(summary.date)
+        .all()
+    )
+    return [(start + timedelta(days=i), counts.get(start + timedelta(days=i), 0))
+            for i in range(days)]
+
+
+def checkins_on(day):
+    summary = DailyAttendanceSummary
+    return db.session.query(
+        db.func.coalesce(db.func.sum(summary.present_count + summary.late_count), 0)
+    ).filter(summary.date == day).scalar()
+
+
+def department_totals(year, month):
+    """Per-department totals for the month, read from the daily rollup."""
+    start, end = month_range(year, month)
+    summary = DailyAttendanceSummary
+    return db.session.query(
+        summary.department,
+        db.func.sum(summary.present_count).label('present_days'),
+        db.func.sum(summary.late_count).label('late_days'),
+        db.func.sum(summary.absent_count).label('absent_days'),
+        Attendance.round_hours(db.func.sum(summary.total_hours)).label('total_hours'),
+    ).filter(summary.date >= start, summary.date < end)\
+        .group_by(summary.department)\
+        .order_by(summary.department)\
+        .all()
+
+
+def _roster(day):
+    """Roster columns for ``day``: every approved employee and their status.
+
+    Attendance is LEFT JOINed on the (user_id, date) index and approved
+    leave is checked with a correlated EXISTS, so the database does the
+    anti-join instead of the app shipping ID lists back and forth. Rows the
+    nightly job recorded as absent do not count as attendance.
+    """
+    from archive import attendance_entity
+    on_leave = db.session.query(LeaveRequest.id).filter(
+        LeaveRequest.user_id == User.id,
+        LeaveRequest.status == 'approved',
+        LeaveRequest.start_date <= day,
+        LeaveRequest.end_date >= day
+    ).exists()
+    attendance = attendance_entity(day, day + timedelta(days=1))
+    status = db.case(
+        (attendance.id.isnot(None), 'present'),
+        (on_leave, 'on_leave'),
+        else_='absent'
+    )
+    query = db.session.query(User.id, User.full_name, User.department, User.email,
+                             status.label('roster_status'))\
+        .outerjoin(attendance, db.and_(attendance.user_id == User.id, attendance.date == day,
+                                       attendance.status != 'absent'))\
+        .filter(User.role == 'user', User.is_approved == True)
+    return query, status
+
+
+def day_roster(day, statuses=('absent', 'on_leave'), department=None):
+    query, status = _roster(day)
+    if department:
+        query = query.filter(User.department == department)
+    return query.filter(status.in_(statuses)).order_by(status, User.full_name, User.id)
+
+
+def roster_counts(day, department=None):
+    query, status = _roster(day)
+    if department:
+        query = query.filter(User.department == department)
+    counts = {'present': 0, 'absent': 0, 'on_leave': 0}
+    counts.update(query.with_entities(status, db.func.count(User.id)).group_by(status).all())
+    return counts
+
+
+def department_names():
+    return [name for (name,) in db.session.query(User.department)
+            .filter(User.role == 'user', User.is_approved == True)
+            .distinct().order_by(User.department)]
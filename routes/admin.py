@@ -1,9 +1,17 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, \
+    Response, abort, current_app, stream_with_context
 from flask_login import login_required, current_user
+from sqlalchemy.orm import contains_eager
 from models import User, Attendance, LeaveRequest
-from app import db
+from app import db, cache, identity_cache, event_hub
+from reports import month_range, dashboard_counters, daily_checkins, \
+    checkins_on, day_roster, roster_counts, department_names
+from snapshots import month_report
+from archive import attendance_entity
 from datetime import datetime, date, timedelta
 from functools import wraps
+import hmac
+import time
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -16,31 +24,84 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def admin_or_token(setting, label):
+    """Admins, or clients presenting ``Authorization: Bearer <app.config[setting]>``."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            token = current_app.config.get(setting)
+            if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+                return f(*args, **kwargs)
+            if current_user.is_authenticated and current_user.is_admin():
+                return f(*args, **kwargs)
+            return jsonify({'error': f'Admin access or {label} token required.'}), 401
+        return decorated_function
+    return decorator
+
+# Badge readers posting imports, and Prometheus scraping /admin/metrics
+admin_or_import_token = admin_or_token('IMPORT_API_TOKEN', 'import')
+admin_or_metrics_token = admin_or_token('METRICS_API_TOKEN', 'metrics')
+
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
     today = date.today()
+    data = cache.get_or_set('admin.dashboard', lambda: _dashboard_data(today),
+                            params={'date': today},
+                            tags=('users', 'attendance', 'leave_requests'))
     
+    return render_template('admin/dashboard.html', today=today, **data)
+
+def _dashboard_data(today):
     total_users = User.query.filter_by(role='user').count()
     approved_users = User.query.filter_by(role='user', is_approved=True).count()
     pending_users = User.query.filter_by(role='user', is_approved=False).count()
     
-    today_checkins = Attendance.query.filter(Attendance.date == today).count()
+    today_checkins = checkins_on(today)
     pending_leaves = LeaveRequest.query.filter_by(status='pending').count()
     
-    recent_attendance = Attendance.query.join(User)\
+    recent_attendance = db.session.query(
+        Attendance.date, Attendance.check_in, Attendance.check_out,
+        Attendance.working_hours, Attendance.status,
+        User.full_name, User.department
+    ).join(User).filter(Attendance.status != 'absent')\
         .order_by(Attendance.check_in.desc()).limit(10).all()
     
-    return render_template('admin/dashboard.html',
-        total_users=total_users,
-        approved_users=approved_users,
-        pending_users=pending_users,
-        today_checkins=today_checkins,
-        pending_leaves=pending_leaves,
-        recent_attendance=recent_attendance,
-        today=today
-    )
+    return {
+        'total_users': total_users,
+        'approved_users': approved_users,
+        'pending_users': pending_users,
+        'today_checkins': today_checkins,
+        'pending_leaves': pending_leaves,
+        'recent_attendance': [row._asdict() for row in recent_attendance]
+    }
+
+@admin_bp.route('/events')
+@login_required
+@admin_required
+def live_events():
+    """Server-Sent Events for the dashboard: check-ins, leaves and user
+    changes as they are committed, each with the updated counters."""
+    from events import format_sse
+    keepalive = current_app.config['EVENTS_KEEPALIVE']
+    deadline = time.monotonic() + current_app.config['EVENTS_STREAM_TIMEOUT']
+    subscription = event_hub.subscribe(request.headers.get('Last-Event-ID'))
+    db.session.close()  # don't hold a pooled connection for the life of the stream
+    
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            # Ends after EVENTS_STREAM_TIMEOUT so workers are recycled; the
+            # browser reconnects and resumes from its Last-Event-ID
+            while (remaining := deadline - time.monotonic()) > 0:
+                event = subscription.get(timeout=min(keepalive, remaining))
+                yield format_sse(event) if event else ': keepalive\n\n'
+        finally:
+            subscription.close()
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @admin_bp.route('/users')
 @login_required
@@ -64,6 +125,8 @@ def approve_user(user_id):
     user = User.query.get_or_404(user_id)
     user.is_approved = True
     db.session.commit()
+    identity_cache.invalidate(user_id)
+    event_hub.publish('user', {'id': user_id, 'action': 'approved', 'user': user.full_name})
     flash(f'{user.full_name} has been approved.', 'success')
     return redirect(url_for('admin.manage_users'))
 
@@ -74,6 +137,8 @@ def reject_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    identity_cache.invalidate(user_id)
+    event_hub.publish('user', {'id': user_id, 'action': 'removed', 'user': user.full_name})
     flash(f'{user.full_name} has been removed.', 'success')
     return redirect(url_for('admin.manage_users'))
 
@@ -84,10 +149,73 @@ def toggle_user(user_id):
     user = User.query.get_or_404(user_id)
     user.is_approved = not user.is_approved
     db.session.commit()
+    identity_cache.invalidate(user_id)
     status = 'activated' if user.is_approved else 'deactivated'
+    event_hub.publish('user', {'id': user_id, 'action': status, 'user': user.full_name})
     flash(f'{user.full_name} has been {status}.', 'success')
     return redirect(url_for('admin.manage_users'))
 
+def _bulk_request():
+    """``(action, ids, filters, remarks)`` from a JSON body or a bulk form."""
+    from bulk import parse_ids
+    payload = request.get_json(silent=True)
+    if payload is None:
+        form = request.form
+        payload = {
+            'action': form.get('action'),
+            'ids': form.getlist('ids') or None,
+            'filter': {key: form[key] for key in ('status', 'department', 'leave_type') if form.get(key)},
+            'remarks': form.get('remarks', ''),
+        }
+    from bulk import BulkError
+    if not isinstance(payload, dict):
+        raise BulkError('expected a JSON object with "action" and "ids" or "filter"')
+    ids = payload.get('ids')
+    filters = payload.get('filter') or {}
+    if not isinstance(filters, dict):
+        raise BulkError('"filter" must be an object')
+    if ids is None and not filters:
+        return payload.get('action'), [], filters, payload.get('remarks', '')
+    return payload.get('action'), parse_ids(ids) if ids is not None else None, \
+        filters, payload.get('remarks', '')
+
+def _bulk_response(run, redirect_to, event):
+    from bulk import BulkError, DONE
+    try:
+        result = run(*_bulk_request())
+    except BulkError as exc:
+        if request.is_json:
+            return jsonify({'error': str(exc)}), 400
+        flash(str(exc), 'danger')
+        return redirect(redirect_to)
+    
+    summary = result.to_dict()
+    done = summary['counts'].get(DONE[result.action])
+    if done:
+        event_hub.publish(event, {'action': DONE[result.action], 'count': done})
+    if request.is_json:
+        return jsonify(summary)
+    counts = ', '.join(f'{n} {outcome.replace("_", " ")}' for outcome, n in sorted(summary['counts'].items()))
+    flash(f'Bulk {result.action}: {counts or "nothing selected"}.', 'success')
+    return redirect(redirect_to)
+
+@admin_bp.route('/api/users/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_users():
+    from bulk import bulk_users as run
+    return _bulk_response(lambda action, ids, filters, remarks: run(action, ids, filters),
+                          url_for('admin.manage_users'), 'user')
+
+@admin_bp.route('/api/leaves/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_leaves():
+    from bulk import bulk_leaves as run
+    return _bulk_response(run, url_for('admin.manage_leaves'), 'leave')
+
+ROSTER_PAGE_SIZE = 50
+
 @admin_bp.route('/attendance')
 @login_required
 @admin_required
@@ -97,55 +225,201 @@ def view_attendance():
         filter_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
     except ValueError:
         filter_date = date.today()
+    department = request.args.get('department') or None
+    page = request.args.get('page', 1, type=int)
+    absent_page = request.args.get('absent_page', 1, type=int)
     
-    records = Attendance.query.join(User)\
-        .filter(Attendance.date == filter_date)\
-        .order_by(Attendance.check_in.desc()).all()
+    attendance = attendance_entity(filter_date, filter_date + timedelta(days=1))
+    records = db.session.query(attendance).join(User, User.id == attendance.user_id)\
+        .options(contains_eager(attendance.user).load_only(User.full_name, User.department))\
+        .filter(attendance.date == filter_date, attendance.status != 'absent')
+    if department:
+        records = records.filter(User.department == department)
+    records = records.order_by(attendance.check_in.desc())\
+        .paginate(page=page, per_page=ROSTER_PAGE_SIZE, error_out=False)
     
-    # Get users who haven't checked in
-    checked_in_ids = [r.user_id for r in records]
-    absent_users = User.query.filter(
-        User.role == 'user',
-        User.is_approved == True,
-        ~User.id.in_(checked_in_ids) if checked_in_ids else True
-    ).all()
+    absent_users = day_roster(filter_date, department=department)\
+        .paginate(page=absent_page, per_page=ROSTER_PAGE_SIZE, error_out=False)
     
     return render_template('admin/attendance.html',
         records=records,
         absent_users=absent_users,
+        counts=roster_counts(filter_date, department),
+        departments=department_names(),
+        department=department,
         selected_date=filter_date
     )
 
+def _report_year():
+    # Months run up to the first of the following year, so 9999 has no end
+    year = request.args.get('year', date.today().year, type=int)
+    if not 1 <= year <= 9998:
+        abort(400, description='year must be between 1 and 9998.')
+    return year
+
 @admin_bp.route('/attendance/report')
 @login_required
 @admin_required
 def attendance_report():
     month = request.args.get('month', date.today().month, type=int)
-    year = request.args.get('year', date.today().year, type=int)
+    year = _report_year()
+    if not 1 <= month <= 12:
+        month = date.today().month
     
-    users = User.query.filter_by(role='user', is_approved=True).all()
-    report_data = []
-    
-    for user in users:
-        stats = user.get_month_stats(year, month)
-        report_data.append({
-            'user': user,
-            'stats': stats
-        })
+    payload = cache.get_or_set(
+        'admin.attendance_report',
+        lambda: month_report(year, month),
+        params={'year': year, 'month': month},
+        tags=('users', 'attendance', 'leave_requests'))
     
     return render_template('admin/report.html',
-        report_data=report_data,
+        report_data=payload['report'],
+        departments=payload['departments'],
         month=month,
         year=year
     )
 
+def _parse_day(value, default):
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        abort(400, description=f'Invalid date {value!r}, expected YYYY-MM-DD.')
+
+def _export_response(filename, header, rows):
+    from exports import FORMATS
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        abort(400, description='format must be csv or xlsx.')
+    mimetype, writer = FORMATS[fmt]
+    return Response(stream_with_context(writer(header, rows)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'})
+
+@admin_bp.route('/attendance/export')
+@login_required
+@admin_required
+def export_attendance():
+    from exports import attendance_rows, ATTENDANCE_HEADER
+    today = date.today()
+    start = _parse_day(request.args.get('start'), today.replace(day=1))
+    end = _parse_day(request.args.get('end'), today)
+    if start > end:
+        abort(400, description='start must not be after end.')
+    
+    rows = attendance_rows(start, end + timedelta(days=1),
+                           department=request.args.get('department') or None,
+                           status=request.args.get('status') or None)
+    return _export_response(f'attendance_{start}_{end}', ATTENDANCE_HEADER, rows)
+
+@admin_bp.route('/attendance/report/export')
+@login_required
+@admin_required
+def export_report():
+    from exports import report_rows, REPORT_HEADER
+    year = _report_year()
+    month = request.args.get('month', type=int)
+    if month is not None and not 1 <= month <= 12:
+        abort(400, description='month must be between 1 and 12.')
+    
+    if month:
+        start, end = month_range(year, month)
+        filename = f'report_{year}_{month:02d}'
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        filename = f'report_{year}'
+    
+    rows = report_rows(start, end, department=request.args.get('department') or None)
+    return _export_response(filename, REPORT_HEADER, rows)
+
+def _analytics_range():
+    today = date.today()
+    start = _parse_day(request.args.get('start'), today - timedelta(days=89))
+    end = _parse_day(request.args.get('end'), today)
+    if start > end:
+        abort(400, description='start must not be after end.')
+    return start, end + timedelta(days=1)
+
+@admin_bp.route('/api/analytics')
+@login_required
+@admin_required
+def analytics():
+    from analytics import AttendanceFrame, GROUP_KEYS
+    start, end = _analytics_range()
+    by = request.args.get('by', 'department')
+    if by not in GROUP_KEYS:
+        abort(400, description=f'by must be one of {", ".join(GROUP_KEYS)}.')
+    department = request.args.get('department') or None
+    
+    def compute():
+        frame = AttendanceFrame.load(start, end, department=department)
+        return {
+            'by': by,
+            'start': start.isoformat(),
+            'end': (end - timedelta(days=1)).isoformat(),
+            'records': len(frame),
+            'groups': {str(label): values for label, values in frame.group_by(by).items()},
+        }
+    
+    payload = cache.get_or_set('admin.analytics', compute,
+                               params={'start': start, 'end': end, 'by': by, 'department': department},
+                               tags=('users', 'attendance'))
+    return jsonify(payload)
+
+@admin_bp.route('/api/analytics/streaks')
+@login_required
+@admin_required
+def analytics_streaks():
+    from analytics import AttendanceFrame, STATUS_CODES, working_days
+    start, end = _analytics_range()
+    status = request.args.get('status') or None
+    if status is not None and status not in STATUS_CODES:
+        abort(400, description='Unknown status.')
+    top = min(request.args.get('top', 20, type=int), 500)
+    
+    def compute():
+        frame = AttendanceFrame.load(start, end, department=request.args.get('department') or None)
+        # Streaks are "current" if they reach the latest working day so far
+        days = [day for day in working_days(start, end) if day <= date.today().toordinal()]
+        streaks = frame.streaks(days, status=status)
+        names = dict(User.query.filter(User.id.in_(list(streaks)))
+                     .with_entities(User.id, User.full_name)) if streaks else {}
+        ranked = sorted(streaks.items(), key=lambda item: (-item[1]['longest'], item[0]))[:top]
+        return [dict(values, user_id=user_id, full_name=names.get(user_id)) for user_id, values in ranked]
+    
+    payload = cache.get_or_set('admin.analytics_streaks', compute,
+                               params={'start': start, 'end': end, 'status': status, 'top': top,
+                                       'department': request.args.get('department') or None},
+                               tags=('users', 'attendance'))
+    return jsonify({'start': start.isoformat(), 'status': status, 'streaks': payload})
+
+@admin_bp.route('/api/attendance/import', methods=['POST'])
+@admin_or_import_token
+def import_attendance():
+    from importer import import_events, parse_csv, parse_json
+    upload = request.files.get('file')
+    try:
+        if upload is not None:
+            data = upload.read()
+            is_csv = upload.filename.lower().endswith('.csv')
+        else:
+            data = request.get_data()
+            is_csv = request.mimetype == 'text/csv'
+        events = parse_csv(data) if is_csv else parse_json(data)
+    except (ValueError, UnicodeDecodeError) as exc:
+        return jsonify({'error': f'Could not parse events: {exc}'}), 400
+    
+    result = import_events(events)
+    return jsonify(result.to_dict())
+
 @admin_bp.route('/leaves')
 @login_required
 @admin_required
 def manage_leaves():
     status_filter = request.args.get('status', 'pending')
     
-    query = LeaveRequest.query.join(User)
+    query = LeaveRequest.query.join(User)\
+        .options(contains_eager(LeaveRequest.user).load_only(User.full_name, User.department))
     if status_filter != 'all':
         query = query.filter(LeaveRequest.status == status_filter)
     
@@ -161,6 +435,7 @@ def approve_leave(leave_id):
     leave.admin_remarks = request.form.get('remarks', '')
     leave.updated_at = datetime.utcnow()
     db.session.commit()
+    event_hub.publish('leave', {'id': leave_id, 'action': 'approved'})
     flash('Leave request approved.', 'success')
     return redirect(url_for('admin.manage_leaves'))
 
@@ -173,37 +448,57 @@ def reject_leave(leave_id):
     leave.admin_remarks = request.form.get('remarks', '')
     leave.updated_at = datetime.utcnow()
     db.session.commit()
+    event_hub.publish('leave', {'id': leave_id, 'action': 'rejected'})
     flash('Leave request rejected.', 'info')
     return redirect(url_for('admin.manage_leaves'))
 
+TREND_WINDOWS = (7, 30, 90, 365)
+
 @admin_bp.route('/api/dashboard-stats')
 @login_required
 @admin_required
 def dashboard_stats():
     today = date.today()
+    days = request.args.get('days', 7, type=int)
+    if days not in TREND_WINDOWS:
+        days = 7
     
-    total_users = User.query.filter_by(role='user', is_approved=True).count()
-    today_present = Attendance.query.filter(Attendance.date == today).count()
-    today_late = Attendance.query.filter(
-        Attendance.date == today, Attendance.status == 'late'
-    ).count()
-    pending_leaves = LeaveRequest.query.filter_by(status='pending').count()
+    payload = cache.get_or_set('admin.dashboard_stats', lambda: _dashboard_stats(today, days),
+                               params={'date': today, 'days': days},
+                               tags=('users', 'attendance', 'leave_requests'))
+    return jsonify(payload)
+
+def _dashboard_stats(today, days):
+    counters = dashboard_counters(today)
     
-    # Weekly trend
-    week_data = []
-    for i in range(6, -1, -1):
-        d = today - timedelta(days=i)
-        count = Attendance.query.filter(Attendance.date == d).count()
-        week_data.append({
-            'date': d.strftime('%a'),
-            'count': count
-        })
-    
-    return jsonify({
-        'total_users': total_users,
-        'today_present': today_present,
-        'today_late': today_late,
-        'today_absent': max(0, total_users - today_present),
-        'pending_leaves': pending_leaves,
-        'week_trend': week_data
-    })
+    label = '%a' if days == 7 else '%d %b'
+    trend = [{
+        'date': d.strftime(label),
+        'day': d.isoformat(),
+        'count': count
+    } for d, count in daily_checkins(today, days)]
+    
+    return {
+        'total_users': counters.total_users,
+        'today_present': counters.present,
+        'today_late': counters.late,
+        'today_absent': max(0, counters.total_users - counters.present),
+        'pending_leaves': counters.pending_leaves,
+        'days': days,
+        'trend': trend,
+        'week_trend': trend[-7:]
+    }
+
+@admin_bp.route('/api/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+    return jsonify(cache.stats())
+
+@admin_bp.route('/metrics')
+@admin_or_metrics_token
+def metrics():
+    profiler = current_app.extensions['profiler']
+    if not current_app.config['PROFILING_ENABLED']:
+        abort(404)
+    return Response(profiler.metrics.render(), mimetype='text/plain; version=0.0.4')
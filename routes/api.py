@@ -0,0 +1,150 @@
+import base64
+import heapq
+from flask import Blueprint, jsonify, request
+from flask_login import current_user
+from models import Attendance
+from app import db
+import punches
+from archive import attendance_sources
+from datetime import datetime, timedelta
+from functools import wraps
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+MAX_PAGE_SIZE = 100
+
+def api_login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required.'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+def _record(attendance):
+    return {
+        'id': attendance.id,
+        'date': attendance.date.isoformat() if attendance.date else None,
+        'check_in': attendance.check_in.isoformat() if attendance.check_in else None,
+        'check_out': attendance.check_out.isoformat() if attendance.check_out else None,
+        'working_hours': attendance.working_hours or 0,
+        'status': attendance.status
+    }
+
+def encode_cursor(check_in, record_id):
+    raw = f'{check_in.isoformat()}|{record_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        check_in, record_id = raw.split('|')
+        return datetime.fromisoformat(check_in), int(record_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _page(columns):
+    """The current user's attendance, keyset-paged over (check_in, id) descending.
+
+    Each source -- the live table and any archive table old enough to hold
+    rows past the cursor -- is seeked on its (user_id, check_in) index with
+    a row-value comparison instead of OFFSET, and the newest rows across them
+    are kept, so page 1,000 costs the same short index range scans as page 1.
+    ``columns`` are column names and must include ``check_in`` and ``id``.
+    """
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+    position = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return None, None
+    
+    end = position[0].date() + timedelta(days=1) if position else None
+    rows = []
+    for table in attendance_sources(end=end):
+        query = db.select(*(table.c[name] for name in columns))\
+            .where(table.c.user_id == current_user.id)
+        if position:
+            query = query.where(db.tuple_(table.c.check_in, table.c.id) < db.tuple_(*position))
+        rows += db.session.execute(
+            query.order_by(table.c.check_in.desc(), table.c.id.desc()).limit(limit + 1)).all()
+    rows = heapq.nlargest(limit + 1, rows, key=lambda row: (row.check_in, row.id))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].check_in, rows[-1].id)
+    return rows, next_cursor
+
+RECORD_COLUMNS = ('id', 'date', 'check_in', 'check_out', 'working_hours', 'status')
+
+@api_bp.route('/attendance', methods=['GET'])
+@api_login_required
+def attendance_list():
+    rows, next_cursor = _page(RECORD_COLUMNS)
+    if rows is None:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    return jsonify({'items': [_record(row) for row in rows], 'next_cursor': next_cursor})
+
+@api_bp.route('/attendance', methods=['POST'])
+@api_login_required
+def mark_attendance():
+    data = request.get_json(silent=True) or {}
+    action = data.get('type')
+    try:
+        if action == 'check-in':
+            attendance = punches.check_in(current_user.id)
+            message, category = punches.check_in_message(attendance)
+        elif action == 'check-out':
+            attendance = punches.check_out(current_user.id)
+            message, category = punches.check_out_message(attendance)
+        else:
+            return jsonify({'error': "type must be 'check-in' or 'check-out'."}), 400
+    except punches.PunchError as exc:
+        return jsonify({'error': exc.message}), 409
+    
+    punches.announce(action.replace('-', '_'), attendance, current_user)
+    return jsonify({'message': message, 'category': category, 'attendance': _record(attendance)})
+
+@api_bp.route('/logs')
+@api_login_required
+def logs():
+    rows, next_cursor = _page(('id', 'check_in', 'check_out'))
+    if rows is None:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    
+    items = []
+    for row in rows:
+        if row.check_out:
+            items.append({'timestamp': row.check_out.isoformat(), 'type': 'check-out'})
+        items.append({'timestamp': row.check_in.isoformat(), 'type': 'check-in'})
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+@api_bp.route('/stats')
+@api_login_required
+def stats():
+    now = datetime.now()
+    today = now.date()
+    week_start = today - timedelta(days=today.weekday())
+    
+    rows = Attendance.query.with_entities(
+        Attendance.date, Attendance.check_in, Attendance.check_out, Attendance.working_hours
+    ).filter(
+        Attendance.user_id == current_user.id,
+        Attendance.date >= week_start,
+        Attendance.date <= today
+    ).all()
+    
+    def hours(row):
+        if row.check_out is None and row.date == today:
+            # Still clocked in: count the time so far
+            return Attendance.hours_between(row.check_in, now)
+        return row.working_hours or 0
+    
+    today_hours = sum(hours(row) for row in rows if row.date == today)
+    week_hours = sum(hours(row) for row in rows)
+    return jsonify({
+        'today_hours': round(today_hours, 2),
+        'week_hours': round(week_hours, 2),
+        'month': current_user.get_month_stats()
+    })
@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from models import User
-from app import db
+from app import db, event_hub
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -36,6 +36,8 @@ def login():
                 flash('Your account is pending approval. Please contact the administrator.', 'warning')
                 return render_template('auth/login.html')
             
+            if db.session.is_modified(user):
+                db.session.commit()  # password was rehashed with current parameters
             login_user(user, remember=True)
             next_page = request.args.get('next')
             if user.is_admin():
@@ -93,6 +95,7 @@ def signup():
         user.set_password(password)
         db.session.add(user)
         db.session.commit()
+        event_hub.publish('user', {'id': user.id, 'action': 'signed_up', 'user': user.full_name})
         
         flash('Account created successfully! Please wait for admin approval.', 'success')
         return redirect(url_for('auth.login'))
@@ -1,7 +1,10 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from models import User, Attendance, LeaveRequest
-from app import db
+from app import db, cache, identity_cache, event_hub
+from cache import user_scope
+from archive import attendance_entity
+import punches
 from datetime import datetime, date, timedelta
 from functools import wraps
 
@@ -20,80 +23,69 @@ def user_required(f):
 @user_required
 def dashboard():
     today = date.today()
-    today_attendance = current_user.get_today_attendance()
-    month_stats = current_user.get_month_stats()
+    data = cache.get_or_set('user.dashboard', lambda: _dashboard_data(current_user, today),
+                            params={'date': today}, user_id=current_user.id,
+                            tags=user_scope('attendance', current_user.id)
+                                 + user_scope('leave_requests', current_user.id))
     
-    recent_attendance = Attendance.query.filter_by(user_id=current_user.id)\
+    return render_template('user/dashboard.html', today=today, **data)
+
+def _dashboard_data(user, today):
+    today_attendance = user.get_today_attendance()
+    month_stats = user.get_month_stats()
+    
+    recent_attendance = db.session.query(
+        Attendance.date, Attendance.check_in, Attendance.check_out,
+        Attendance.working_hours, Attendance.status
+    ).filter(Attendance.user_id == user.id)\
         .order_by(Attendance.check_in.desc()).limit(10).all()
     
     pending_leaves = LeaveRequest.query.filter_by(
-        user_id=current_user.id, status='pending'
+        user_id=user.id, status='pending'
     ).count()
     
-    return render_template('user/dashboard.html',
-        today_attendance=today_attendance,
-        month_stats=month_stats,
-        recent_attendance=recent_attendance,
-        pending_leaves=pending_leaves,
-        today=today
-    )
+    return {
+        'today_attendance': _attendance_dict(today_attendance) if today_attendance else None,
+        'month_stats': month_stats,
+        'recent_attendance': [row._asdict() for row in recent_attendance],
+        'pending_leaves': pending_leaves
+    }
+
+def _attendance_dict(record):
+    return {
+        'date': record.date,
+        'check_in': record.check_in,
+        'check_out': record.check_out,
+        'working_hours': record.working_hours,
+        'status': record.status
+    }
 
 @user_bp.route('/check-in', methods=['POST'])
 @login_required
 @user_required
 def check_in():
-    today = date.today()
-    existing = Attendance.query.filter(
-        Attendance.user_id == current_user.id,
-        Attendance.date == today
-    ).first()
-    
-    if existing:
-        flash('You have already checked in today.', 'warning')
+    try:
+        attendance = punches.check_in(current_user.id)
+    except punches.PunchError as exc:
+        flash(exc.message, exc.category)
         return redirect(url_for('user.dashboard'))
     
-    now = datetime.now()
-    # Consider late if after 9:30 AM
-    status = 'late' if now.hour > 9 or (now.hour == 9 and now.minute > 30) else 'present'
-    
-    attendance = Attendance(
-        user_id=current_user.id,
-        check_in=now,
-        status=status,
-        date=today
-    )
-    db.session.add(attendance)
-    db.session.commit()
-    
-    if status == 'late':
-        flash('Checked in successfully. Note: You are marked as late.', 'warning')
-    else:
-        flash('Checked in successfully!', 'success')
+    punches.announce('check_in', attendance, current_user)
+    flash(*punches.check_in_message(attendance))
     return redirect(url_for('user.dashboard'))
 
 @user_bp.route('/check-out', methods=['POST'])
 @login_required
 @user_required
 def check_out():
-    today = date.today()
-    attendance = Attendance.query.filter(
-        Attendance.user_id == current_user.id,
-        Attendance.date == today
-    ).first()
-    
-    if not attendance:
-        flash('You have not checked in today.', 'warning')
+    try:
+        attendance = punches.check_out(current_user.id)
+    except punches.PunchError as exc:
+        flash(exc.message, exc.category)
         return redirect(url_for('user.dashboard'))
     
-    if attendance.check_out:
-        flash('You have already checked out today.', 'warning')
-        return redirect(url_for('user.dashboard'))
-    
-    attendance.check_out = datetime.now()
-    attendance.calculate_hours()
-    db.session.commit()
-    
-    flash(f'Checked out successfully! Working hours: {attendance.working_hours}h', 'success')
+    punches.announce('check_out', attendance, current_user)
+    flash(*punches.check_out_message(attendance))
     return redirect(url_for('user.dashboard'))
 
 @user_bp.route('/attendance-history')
@@ -101,8 +93,9 @@ def check_out():
 @user_required
 def attendance_history():
     page = request.args.get('page', 1, type=int)
-    records = Attendance.query.filter_by(user_id=current_user.id)\
-        .order_by(Attendance.check_in.desc())\
+    attendance = attendance_entity(user_ids=[current_user.id])
+    records = db.session.query(attendance).filter(attendance.user_id == current_user.id)\
+        .order_by(attendance.check_in.desc())\
         .paginate(page=page, per_page=15, error_out=False)
     
     return render_template('user/attendance_history.html', records=records)
@@ -141,6 +134,7 @@ def leave_request():
         )
         db.session.add(leave)
         db.session.commit()
+        event_hub.publish('leave', {'id': leave.id, 'action': 'requested', 'user': current_user.full_name})
         
         flash('Leave request submitted successfully!', 'success')
         return redirect(url_for('user.my_leaves'))
@@ -160,18 +154,21 @@ def my_leaves():
 @user_required
 def profile():
     if request.method == 'POST':
-        current_user.full_name = request.form.get('full_name', current_user.full_name)
-        current_user.phone = request.form.get('phone', current_user.phone)
-        current_user.department = request.form.get('department', current_user.department)
+        user = db.session.get(User, current_user.id)
+        user.full_name = request.form.get('full_name', user.full_name)
+        user.phone = request.form.get('phone', user.phone)
+        user.department = request.form.get('department', user.department)
         
         new_password = request.form.get('new_password', '')
         if new_password:
             if len(new_password) < 6:
                 flash('Password must be at least 6 characters.', 'danger')
                 return render_template('user/profile.html')
-            current_user.set_password(new_password)
+            user.set_password(new_password)
         
         db.session.commit()
+        identity_cache.invalidate(user.id)
         flash('Profile updated successfully!', 'success')
+        return redirect(url_for('user.profile'))
     
     return render_template('user/profile.html')
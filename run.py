@@ -1,6 +1,6 @@
 from app import create_app
 
-app = create_app()
+app = create_app(start_scheduler=True)
 
 if __name__ == '__main__':
     app.run(debug=False, host='0.0.0.0', port=5000)
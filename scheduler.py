@@ -0,0 +1,181 @@
+"""Background jobs with persistent state, retries and cross-worker locking.
+
+Jobs are plain functions registered with :func:`job` (the built-in ones live
+in jobs.py) and run once a day at a fixed local time. Their state lives in
+``scheduled_jobs``: the next run time, the last outcome and a lease. Every
+worker may poll, but a run starts only after a compare-and-set ``UPDATE``
+takes the lease (the job is due and nobody else holds an unexpired lease),
+so each run happens in exactly one process, whichever gets there first. A
+worker that dies mid-run leaves a lease that simply expires.
+
+Failures are retried with exponential backoff up to ``retries`` times, then
+the job is marked failed and waits for its next scheduled run.
+
+``SCHEDULER_ENABLED=1`` starts a polling thread from ``create_app`` in web
+processes (a WSGI server or ``flask run``, not other CLI commands);
+alternatively run ``flask scheduler run`` as a separate worker process.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, time, timedelta
+from sqlalchemy import or_, update
+from app import db
+from models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+JOBS = {}
+
+
+class Job:
+    def __init__(self, name, func, at, retries=3, retry_delay=300, lease=3600):
+        self.name = name
+        self.func = func
+        self.at = time.fromisoformat(at) if isinstance(at, str) else at
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.lease = lease
+
+    def next_run(self, now):
+        """The first scheduled time strictly after ``now``."""
+        run = datetime.combine(now.date(), self.at)
+        return run if run > now else run + timedelta(days=1)
+
+    def backoff(self, attempt):
+        return timedelta(seconds=self.retry_delay * 2 ** (attempt - 1))
+
+
+def job(name, at, **options):
+    """Register ``func(now)`` to run daily at ``at`` ('HH:MM'). Its return
+    value, if any, is stored as JSON in ``last_result``."""
+    def decorator(func):
+        JOBS[name] = Job(name, func, at, **options)
+        return func
+    return decorator
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def sync_jobs(now=None):
+    """Give every registered job a state row; existing rows are left alone."""
+    import jobs  # noqa: F401 - registers the built-in jobs
+    now = now or datetime.now()
+    known = {name for name, in db.session.query(ScheduledJob.name)}
+    for name, entry in JOBS.items():
+        if name not in known:
+            db.session.add(ScheduledJob(name=name, next_run_at=entry.next_run(now), attempts=0))
+    db.session.commit()
+
+
+def claim(name, now, lease, force=False):
+    """Take the lease on ``name`` if it is due (or ``force``) and free."""
+    condition = [ScheduledJob.name == name,
+                 or_(ScheduledJob.locked_until.is_(None), ScheduledJob.locked_until < now)]
+    if not force:
+        condition.append(ScheduledJob.next_run_at <= now)
+    owner = worker_id()
+    result = db.session.execute(
+        update(ScheduledJob).where(*condition)
+        .values(locked_by=owner, locked_until=now + timedelta(seconds=lease), last_started_at=now),
+        execution_options={'synchronize_session': False})
+    db.session.commit()
+    return owner if result.rowcount == 1 else None
+
+
+def _finish(name, owner, **values):
+    db.session.execute(
+        update(ScheduledJob).where(ScheduledJob.name == name, ScheduledJob.locked_by == owner)
+        .values(locked_by=None, locked_until=None, last_finished_at=datetime.now(), **values),
+        execution_options={'synchronize_session': False})
+    db.session.commit()
+
+
+def run_job(name, now=None, force=False):
+    """Run ``name`` if this worker wins its lease. Returns the stored row's
+    status ('ok', 'retrying', 'failed') or None if the job was not run."""
+    entry = JOBS[name]
+    now = now or datetime.now()
+    owner = claim(name, now, entry.lease, force)
+    if owner is None:
+        return None
+
+    try:
+        result = entry.func(now)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception('Job %s failed', name)
+        attempts = db.session.get(ScheduledJob, name).attempts + 1
+        if attempts <= entry.retries:
+            status, next_run = 'retrying', datetime.now() + entry.backoff(attempts)
+        else:
+            status, next_run, attempts = 'failed', entry.next_run(now), 0
+        _finish(name, owner, last_status=status, next_run_at=next_run, attempts=attempts,
+                last_error=traceback.format_exc(limit=5))
+        return status
+
+    _finish(name, owner, last_status='ok', next_run_at=entry.next_run(now), attempts=0,
+            last_error=None, last_result=json.dumps(result, default=str) if result is not None else None)
+    return 'ok'
+
+
+def run_pending(now=None):
+    """Run every due job this worker can lock; returns ``{name: status}``."""
+    sync_jobs(now)
+    now = now or datetime.now()
+    due = [name for name, in db.session.query(ScheduledJob.name)
+           .filter(ScheduledJob.next_run_at <= now, ScheduledJob.name.in_(list(JOBS)))
+           .order_by(ScheduledJob.next_run_at)]
+    ran = {}
+    for name in due:
+        status = run_job(name, now)
+        if status is not None:
+            ran[name] = status
+    return ran
+
+
+class Scheduler:
+    def __init__(self, app=None):
+        self._thread = None
+        self._stopped = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, start=False):
+        app.config.setdefault('SCHEDULER_ENABLED', False)
+        app.config.setdefault('SCHEDULER_POLL_INTERVAL', 60)
+        app.extensions['scheduler'] = self
+        if start and app.config['SCHEDULER_ENABLED'] and not app.config.get('TESTING'):
+            self.start(app)
+
+    def loop(self, app, stop=None):
+        stop = stop or self._stopped
+        interval = app.config['SCHEDULER_POLL_INTERVAL']
+        while True:
+            with app.app_context():
+                try:
+                    run_pending()
+                except Exception:
+                    logger.exception('Scheduler poll failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            if stop.wait(interval):
+                return
+
+    def start(self, app):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.loop, args=(app,), name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,91 @@
+"""Precomputed monthly reports for closed months.
+
+The nightly ``report-snapshot`` job (see jobs.py) stores last month's report
+in ``report_snapshots`` so the admin report page reads one row instead of
+aggregating the month while the admin waits. The current month is always
+computed live.
+
+A snapshot is dropped as soon as anything it summarises changes: attendance
+writes reach :func:`drop_snapshots` through ``summary.apply_deltas``, and
+leave changes through the flush listener below (Core writers such as bulk
+leave decisions call it themselves). The next request recomputes the month
+live until the job stores it again. Renaming or re-approving users is not
+tracked; the nightly job refreshes last month's snapshot regardless.
+"""
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, event, or_
+from app import db
+from models import LeaveRequest, ReportSnapshot
+
+
+def _closed_months(days):
+    current = date.today().replace(day=1)
+    return {(day.year, day.month) for day in days if day is not None and day < current}
+
+
+def _months_between(start, end):
+    months = set()
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.add((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def drop_snapshots(session, days=(), ranges=()):
+    """Forget snapshots of closed months containing any of ``days`` or
+    overlapping any ``(start, end)`` in ``ranges``. Costs nothing when all
+    of them fall in the current month."""
+    months = _closed_months(days)
+    for start, end in ranges:
+        if start is not None and end is not None:
+            months |= _closed_months(date(year, month, 1) for year, month in _months_between(start, end))
+    if not months:
+        return
+    table = ReportSnapshot.__table__
+    session.connection().execute(table.delete().where(
+        or_(*(and_(table.c.year == year, table.c.month == month) for year, month in months))))
+
+
+def load_snapshot(year, month):
+    row = db.session.query(ReportSnapshot.payload)\
+        .filter(ReportSnapshot.year == year, ReportSnapshot.month == month).first()
+    return json.loads(row.payload) if row else None
+
+
+def compute_report(year, month):
+    from reports import monthly_report, department_totals
+    return {
+        'report': monthly_report(year, month),
+        'departments': [row._asdict() for row in department_totals(year, month)],
+    }
+
+
+def store_snapshot(year, month):
+    """Compute and save the report for a closed month; the caller commits."""
+    payload = compute_report(year, month)
+    table = ReportSnapshot.__table__
+    db.session.execute(table.delete().where(table.c.year == year, table.c.month == month))
+    db.session.execute(table.insert().values(year=year, month=month, computed_at=datetime.utcnow(),
+                                             payload=json.dumps(payload, default=str)))
+    return payload
+
+
+def month_report(year, month):
+    """``{'report': [...], 'departments': [...]}`` for the month, from its
+    snapshot when the month is closed and one exists."""
+    if date(year, month, 1) < date.today().replace(day=1):
+        payload = load_snapshot(year, month)
+        if payload is not None:
+            return payload
+    return compute_report(year, month)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _drop_for_leaves(session, flush_context):
+    ranges = []
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, LeaveRequest):
+            ranges.append((obj.start_date, obj.end_date))
+    drop_snapshots(session, ranges=ranges)
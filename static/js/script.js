@@ -42,7 +42,7 @@ async function markAttendance(type) {
 async function loadLogs() {
     try {
         const response = await fetch('/api/logs');
-        const logs = await response.json();
+        const logs = (await response.json()).items;
 
         const tbody = document.getElementById('logsBody');
         tbody.innerHTML = '';
@@ -0,0 +1,207 @@
+"""Daily attendance rollup kept in step with the attendance table.
+
+``DailyAttendanceSummary`` holds one row per (date, department). Rather than
+re-aggregating raw attendance for every dashboard and report, the rollup is
+adjusted by deltas whenever attendance rows are inserted, updated or deleted
+through the ORM session, inside the same transaction as the change itself.
+Code that writes attendance with Core statements (bulk imports, archival)
+must call :func:`apply_deltas` itself or run :func:`rebuild_summary`.
+
+Rows are credited to the user's current department, as a rebuild would do,
+so a department change moves that user's whole history across.
+"""
+from collections import defaultdict
+from sqlalchemy import event, inspect
+from app import db
+from models import User, Attendance, DailyAttendanceSummary
+from snapshots import drop_snapshots
+
+COUNTERS = ('present_count', 'late_count', 'absent_count', 'total_hours')
+
+STATUS_COUNTER = {
+    'present': 'present_count',
+    'half-day': 'present_count',
+    'late': 'late_count',
+    'absent': 'absent_count',
+}
+
+
+def contribution(status, hours):
+    counter = STATUS_COUNTER.get(status or 'present', 'present_count')
+    return {counter: 1, 'total_hours': hours or 0.0}
+
+
+def _old_value(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.dict.get(key)
+
+
+def _department(session, user_id, cache):
+    if user_id not in cache:
+        user = session.get(User, user_id)
+        cache[user_id] = user.department if user and user.department else 'General'
+    return cache[user_id]
+
+
+def _merge(deltas, key, values, sign=1):
+    for name, value in values.items():
+        deltas[key][name] += sign * value
+
+
+def _department_moves(session, departments):
+    """Re-credit the whole history of users whose department changed.
+
+    Attendance touched in the same flush is booked against the old
+    department first (``departments`` is seeded with it), so moving every
+    stored row afterwards leaves nothing behind.
+    """
+    moved = {}
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj.id is not None:
+            history = inspect(obj).attrs.department.history
+            if history.has_changes():
+                old = (history.deleted[0] if history.deleted else None) or 'General'
+                new = obj.department or 'General'
+                departments[obj.id] = old
+                if old != new:
+                    moved[obj.id] = (old, new)
+    return moved
+
+
+def _apply_moves(session, deltas, moved):
+    from archive import attendance_table
+    for user_id, (old, new) in moved.items():
+        attendance = attendance_table(user_ids=[user_id])
+        rows = session.execute(
+            db.select(attendance.c.date, attendance.c.status, attendance.c.working_hours)
+            .where(attendance.c.user_id == user_id, attendance.c.date.isnot(None)))
+        for day, status, hours in rows:
+            values = contribution(status, hours)
+            _merge(deltas, (day, old), values, -1)
+            _merge(deltas, (day, new), values)
+
+
+def _collect(session):
+    deltas = defaultdict(lambda: defaultdict(float))
+    departments = {}
+    moved = _department_moves(session, departments)
+
+    for obj in session.new:
+        if isinstance(obj, Attendance) and obj.date is not None:
+            key = (obj.date, _department(session, obj.user_id, departments))
+            _merge(deltas, key, contribution(obj.status, obj.working_hours))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Attendance) or not session.is_modified(obj):
+            continue
+        state = inspect(obj)
+        old_date = _old_value(state, 'date')
+        old_user = _old_value(state, 'user_id')
+        if old_date is not None:
+            key = (old_date, _department(session, old_user, departments))
+            _merge(deltas, key, contribution(_old_value(state, 'status'),
+                                             _old_value(state, 'working_hours')), -1)
+        if obj.date is not None:
+            key = (obj.date, _department(session, obj.user_id, departments))
+            _merge(deltas, key, contribution(obj.status, obj.working_hours))
+
+    for obj in session.deleted:
+        if isinstance(obj, Attendance) and obj.date is not None:
+            state = inspect(obj)
+            key = (_old_value(state, 'date'),
+                   _department(session, _old_value(state, 'user_id'), departments))
+            _merge(deltas, key, contribution(_old_value(state, 'status'),
+                                             _old_value(state, 'working_hours')), -1)
+
+    _apply_moves(session, deltas, moved)
+    return {key: values for key, values in deltas.items()
+            if any(abs(v) > 1e-9 for v in values.values())}
+
+
+def _upsert_statement(dialect_name):
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    table = DailyAttendanceSummary.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.department],
+        set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS}
+    )
+
+
+def apply_deltas(session, deltas):
+    """Add ``{(date, department): {counter: delta}}`` onto the rollup."""
+    if not deltas:
+        return
+    drop_snapshots(session, days=[day for day, _ in deltas])
+    table = DailyAttendanceSummary.__table__
+    rows = [dict({name: 0 for name in COUNTERS}, date=day, department=department,
+                 **{name: value for name, value in values.items()})
+            for (day, department), values in deltas.items()]
+    for row in rows:
+        for name in COUNTERS[:-1]:
+            row[name] = int(round(row[name]))
+        row['total_hours'] = round(row['total_hours'], 2)
+
+    connection = session.connection()
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is not None:
+        connection.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(table.c.date == row['date'], table.c.department == row['department'])
+            .values({name: table.c[name] + row[name] for name in COUNTERS})
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert(), row)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_summary(session, flush_context):
+    apply_deltas(session, _collect(session))
+
+
+def rebuild_summary(start=None, end=None):
+    """Recompute the rollup from raw attendance for [start, end).
+
+    Either bound may be omitted to rebuild everything before/after it.
+    Archived attendance is included. Runs in the caller's transaction;
+    commit afterwards.
+    """
+    from archive import attendance_entity
+    attendance = attendance_entity(start, end)
+    table = DailyAttendanceSummary.__table__
+    delete = table.delete()
+    source = db.session.query(
+        attendance.date,
+        db.func.coalesce(User.department, 'General'),
+        db.func.sum(db.case((attendance.status.in_(['late', 'absent']), 0), else_=1)),
+        db.func.sum(db.case((attendance.status == 'late', 1), else_=0)),
+        db.func.sum(db.case((attendance.status == 'absent', 1), else_=0)),
+        Attendance.round_hours(db.func.coalesce(db.func.sum(attendance.working_hours), 0)),
+    ).join(User, User.id == attendance.user_id)\
+        .filter(attendance.date.isnot(None))
+    if start is not None:
+        delete = delete.where(table.c.date >= start)
+        source = source.filter(attendance.date >= start)
+    if end is not None:
+        delete = delete.where(table.c.date < end)
+        source = source.filter(attendance.date < end)
+    source = source.group_by(attendance.date, db.func.coalesce(User.department, 'General'))
+
+    db.session.execute(delete)
+    result = db.session.execute(
+        table.insert().from_select(['date', 'department', *COUNTERS], source.statement)
+    )
+    return result.rowcount
@@ -0,0 +1,71 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import Config  # noqa: E402
+
+
+def make_config(database, **overrides):
+    return type('TestConfig', (Config,), dict({
+        'SQLALCHEMY_DATABASE_URI': database,
+        'TESTING': True,
+        'CACHE_BACKEND': 'null',
+        'SCHEDULER_ENABLED': False,
+    }, **overrides))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """A freshly bootstrapped app. Requests must be made outside an app
+    context: Flask would reuse it, and with it Flask-Login's user in ``g``."""
+    from app import create_app, db
+    app = create_app(make_config('sqlite:///' + str(tmp_path / 'test.db')))
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def context(app):
+    from app import db
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def make_user(app):
+    """Creates an employee and returns its id."""
+    from app import db
+    from models import User
+    counter = [0]
+
+    def make(department='Engineering', approved=True, created_at=datetime(2020, 1, 1)):
+        counter[0] += 1
+        with app.app_context():
+            user = User(username=f'user{counter[0]}', email=f'user{counter[0]}@example.com',
+                        full_name=f'User {counter[0]}', department=department, role='user',
+                        is_approved=approved, created_at=created_at, password_hash='-')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make
+
+
+def admin_id(app):
+    from models import User
+    with app.app_context():
+        return User.query.filter_by(role='admin').with_entities(User.id).scalar()
+
+
+def client_for(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
@@ -0,0 +1,50 @@
+from datetime import date, datetime, time, timedelta
+
+from app import db
+from archive import archive_range, live_floor
+from conftest import client_for
+from models import Attendance
+from test_sargable import captured_sql
+
+
+def seed_history(app, user_id, days=80):
+    today = date.today()
+    with app.app_context():
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            check_in = datetime.combine(day, time(9))
+            db.session.add(Attendance(user_id=user_id, date=day, check_in=check_in, status='present'))
+        db.session.commit()
+        return [row.id for row in Attendance.query.filter_by(user_id=user_id)
+                .order_by(Attendance.check_in.desc(), Attendance.id.desc())]
+
+
+def page_through(client, limit):
+    ids, cursor = [], None
+    while True:
+        response = client.get('/api/attendance', query_string={'limit': limit, 'cursor': cursor or ''})
+        assert response.status_code == 200
+        body = response.get_json()
+        ids += [item['id'] for item in body['items']]
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids
+
+
+def test_keyset_paging_reads_through_the_archive_without_a_union(app, make_user):
+    user_id = make_user()
+    expected = seed_history(app, user_id)
+    client = client_for(app, user_id)
+    assert page_through(client, 7) == expected
+
+    with app.app_context():
+        assert archive_range(None, live_floor())
+    with captured_sql() as statements:
+        assert page_through(client, 7) == expected
+    pages = [sql for sql in statements if 'check_in' in sql]
+    assert pages and not any('UNION' in sql for sql in pages)
+
+
+def test_bad_cursor_is_rejected(app, make_user):
+    client = client_for(app, make_user())
+    assert client.get('/api/attendance?cursor=nope').status_code == 400
@@ -0,0 +1,117 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import db, identity_cache
+from bulk import bulk_leaves, bulk_users
+from conftest import admin_id, client_for
+from models import Attendance, LeaveRequest, ReportSnapshot, User
+
+
+@pytest.mark.parametrize('path', ['/admin/api/users/bulk', '/admin/api/leaves/bulk'])
+@pytest.mark.parametrize('payload', [[1, 2], 'approve', {'action': 'approve', 'filter': [1]}])
+def test_malformed_json_is_a_400(app, path, payload):
+    response = client_for(app, admin_id(app)).post(path, json=payload)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def add_leave(user_id, status='pending', start=date(2026, 3, 10), leave_type='casual'):
+    leave = LeaveRequest(user_id=user_id, leave_type=leave_type, reason='-', status=status,
+                         start_date=start, end_date=start + timedelta(days=1))
+    db.session.add(leave)
+    db.session.commit()
+    return leave.id
+
+
+def outcomes(result):
+    return {row['id']: row['outcome'] for row in result.to_dict()['results']}
+
+
+def test_users_by_ids_get_an_outcome_each(context, make_user):
+    pending, approved, with_leave, with_attendance = \
+        make_user(approved=False), make_user(), make_user(approved=False), make_user(approved=False)
+    add_leave(with_leave)
+    db.session.add(Attendance(user_id=with_attendance, date=date(2026, 3, 2),
+                              check_in=datetime(2026, 3, 2, 9), status='present'))
+    db.session.commit()
+    admin = User.query.filter_by(role='admin').one().id
+
+    result = bulk_users('approve', [pending, approved, admin, 9999])
+    assert outcomes(result) == {pending: 'approved', approved: 'unchanged', admin: 'admin', 9999: 'not_found'}
+    assert db.session.get(User, pending).is_approved
+
+    result = bulk_users('reject', [with_leave, with_attendance, pending])
+    assert outcomes(result) == {with_leave: 'has_history', with_attendance: 'has_history', pending: 'rejected'}
+    assert db.session.get(User, pending) is None
+    assert db.session.get(User, with_leave) is not None
+
+
+def test_users_by_filter_skip_admins_and_other_departments(context, make_user):
+    engineering, sales = make_user(approved=False), make_user(department='Sales', approved=False)
+    result = bulk_users('approve', filters={'status': 'pending', 'department': 'Engineering'})
+    assert outcomes(result) == {engineering: 'approved'}
+    assert not db.session.get(User, sales).is_approved
+
+    result = bulk_users('deactivate', [engineering, sales], filters={'department': 'Engineering'})
+    assert outcomes(result) == {engineering: 'deactivated', sales: 'not_matched'}
+
+
+def test_leaves_by_ids_and_by_filter(context, make_user):
+    engineering, sales = make_user(), make_user(department='Sales')
+    first, second = add_leave(engineering), add_leave(engineering, leave_type='sick')
+    other, done = add_leave(sales), add_leave(sales, status='rejected')
+
+    result = bulk_leaves('reject', [first, done, 9999], remarks='overlaps a release')
+    assert outcomes(result) == {first: 'rejected', done: 'unchanged', 9999: 'not_found'}
+    assert db.session.get(LeaveRequest, first).admin_remarks == 'overlaps a release'
+
+    result = bulk_leaves('approve', filters={'department': 'Engineering'})
+    assert outcomes(result) == {second: 'approved'}
+    assert db.session.get(LeaveRequest, other).status == 'pending'
+
+
+def test_a_failed_batch_changes_nothing(context, make_user, monkeypatch):
+    import bulk
+    user_ids = [make_user(approved=False) for _ in range(3)]
+    monkeypatch.setattr(bulk, 'CHUNK_SIZE', 1)
+    execute, calls = db.session.execute, []
+
+    def failing(statement, *args, **kwargs):
+        if getattr(statement, 'is_update', False):
+            calls.append(statement)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'execute', failing)
+    with pytest.raises(RuntimeError):
+        bulk_users('approve', user_ids)
+    db.session.rollback()
+    monkeypatch.undo()
+    assert User.query.filter(User.id.in_(user_ids), User.is_approved == True).count() == 0
+
+
+def test_identities_and_snapshots_are_invalidated(context, make_user):
+    from snapshots import store_snapshot
+    user_id = make_user()
+    identity_cache.clear()
+    assert identity_cache.load(user_id).is_approved
+    bulk_users('deactivate', [user_id])
+    assert not identity_cache.load(user_id).is_approved
+
+    last_month = date.today().replace(day=1) - timedelta(days=1)
+    leave_id = add_leave(user_id, start=last_month.replace(day=1))
+    store_snapshot(last_month.year, last_month.month)
+    db.session.commit()
+    assert ReportSnapshot.query.count() == 1
+    bulk_leaves('approve', [leave_id])
+    assert ReportSnapshot.query.count() == 0
+
+
+def test_json_requests_return_the_outcomes(app, make_user):
+    user_id = make_user(approved=False)
+    response = client_for(app, admin_id(app)).post('/admin/api/users/bulk',
+                                                  json={'action': 'approve', 'ids': [user_id]})
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'id': user_id, 'outcome': 'approved'}]
@@ -0,0 +1,44 @@
+import threading
+from datetime import date
+
+from sqlalchemy import text
+
+from app import db
+from conftest import client_for
+from models import Attendance
+
+THREADS = 16
+
+
+def test_concurrent_check_ins_under_wal(app, make_user):
+    user_ids = [make_user() for _ in range(THREADS * 2)]
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+
+    errors, statuses = [], []
+    barrier = threading.Barrier(THREADS)
+
+    def hammer(index):
+        try:
+            # Two employees per thread, and each one posts twice
+            clients = [client_for(app, user_id) for user_id in user_ids[index::THREADS]]
+            barrier.wait()
+            for _ in range(2):
+                for client in clients:
+                    statuses.append(client.post('/user/check-in').status_code)
+        except Exception as exc:  # collected and asserted below
+            errors.append(repr(exc))
+
+    workers = [threading.Thread(target=hammer, args=(index,)) for index in range(THREADS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert not [error for error in errors if 'database is locked' in error]
+    assert not errors, errors[:3]
+    assert set(statuses) == {302}
+    with app.app_context():
+        rows = db.session.query(Attendance.user_id, db.func.count())\
+            .filter(Attendance.date == date.today()).group_by(Attendance.user_id).all()
+    assert sorted(rows) == [(user_id, 1) for user_id in sorted(user_ids)]
@@ -0,0 +1,28 @@
+from datetime import date, datetime, time
+
+from app import event_hub
+from importer import import_events
+
+
+def test_import_publishes_one_event_per_chunk(context, make_user):
+    first, second = make_user(), make_user()
+    today = date.today()
+    stamp = lambda hour: datetime.combine(today, time(hour)).isoformat()
+    subscription = event_hub.subscribe()
+    try:
+        result = import_events([
+            {'user': first, 'timestamp': stamp(9), 'direction': 'in'},
+            {'user': second, 'timestamp': stamp(9), 'direction': 'in'},
+            {'user': first, 'timestamp': stamp(17), 'direction': 'out'},
+        ], chunk_size=1)
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+    finally:
+        event_hub.unsubscribe(subscription)
+
+    assert (result.inserted, len(result.errors)) == (2, 0)
+    imports = [event for event in events if event['type'] == 'import']
+    assert [event['data']['inserted'] for event in imports] == [1, 1]
+    assert imports[-1]['data']['days'] == [today.isoformat()]
+    assert imports[-1]['counters']['today_checkins'] == 2
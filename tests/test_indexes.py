@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from models import User, Attendance, LeaveRequest
+
+
+def query_plan(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return ' | '.join(row[-1] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)))
+
+
+@pytest.mark.parametrize('build, index', [
+    (lambda: Attendance.query.filter_by(user_id=1, date=date(2026, 3, 2)), 'uq_attendance_user_date'),
+    (lambda: Attendance.query.filter_by(user_id=1).order_by(Attendance.check_in.desc()).limit(20),
+     'ix_attendance_user_check_in'),
+    (lambda: Attendance.query.filter(Attendance.date == date(2026, 3, 2)).order_by(Attendance.check_in.desc()),
+     'ix_attendance_date_check_in'),
+    (lambda: LeaveRequest.query.filter_by(status='pending').order_by(LeaveRequest.created_at.desc()),
+     'ix_leave_requests_status_created_at'),
+    (lambda: User.query.filter_by(role='user', is_approved=False), 'ix_users_role_is_approved'),
+])
+def test_hot_queries_use_indexes(context, build, index):
+    plan = query_plan(build())
+    assert index in plan, plan
@@ -0,0 +1,79 @@
+from datetime import date, datetime, time
+
+from app import db
+from importer import import_events
+from jobs import record_absences
+from models import Attendance, DailyAttendanceSummary
+from reports import monthly_report, roster_counts, day_roster, user_month_stats
+
+DAY = date(2026, 3, 3)  # a Tuesday
+NIGHT = datetime(2026, 3, 4, 0, 30)
+
+
+def test_recorded_absences_read_as_absent(context, make_user):
+    present_id, absent_id = make_user(), make_user()
+    check_in = datetime.combine(DAY, time(9))
+    db.session.add(Attendance(user_id=present_id, date=DAY, check_in=check_in,
+                              check_out=check_in.replace(hour=17), working_hours=8.0, status='present'))
+    db.session.commit()
+
+    assert record_absences(NIGHT)['recorded']
+    db.session.commit()
+    assert Attendance.query.filter_by(user_id=absent_id, date=DAY, status='absent').count() == 1
+
+    assert roster_counts(DAY) == {'present': 1, 'absent': 1, 'on_leave': 0}
+    assert [row.id for row in day_roster(DAY)] == [absent_id]
+    report = {row['id']: row for row in monthly_report(DAY.year, DAY.month)}
+    assert report[absent_id]['total_days'] == 0
+    assert report[present_id]['total_days'] == 1
+    stats = user_month_stats(absent_id, DAY.year, DAY.month)
+    assert stats['total_days'] == 0 and stats['absent_days'] >= 1
+    summary = DailyAttendanceSummary.query.filter_by(date=DAY).one()
+    assert (summary.present_count, summary.absent_count) == (1, 1)
+
+
+def test_import_replaces_a_recorded_absence(context, make_user):
+    user_id = make_user()
+    record_absences(NIGHT)
+    db.session.commit()
+
+    out_only = import_events([{'user': user_id, 'timestamp': f'{DAY}T17:00:00', 'direction': 'out'}])
+    assert out_only.errors and Attendance.query.filter_by(user_id=user_id, date=DAY).one().status == 'absent'
+
+    result = import_events([{'user': user_id, 'timestamp': f'{DAY}T09:05:00', 'direction': 'in'},
+                            {'user': user_id, 'timestamp': f'{DAY}T17:05:00', 'direction': 'out'}])
+    assert (result.updated, result.errors) == (1, [])
+    row = Attendance.query.filter_by(user_id=user_id, date=DAY).one()
+    assert (row.status, row.working_hours, row.check_in.time()) == ('present', 8.0, time(9, 5))
+    assert roster_counts(DAY) == {'present': 1, 'absent': 0, 'on_leave': 0}
+    summary = DailyAttendanceSummary.query.filter_by(date=DAY).one()
+    assert (summary.present_count, summary.absent_count, summary.total_hours) == (1, 0, 8.0)
+
+
+def test_exports_and_admin_dashboard_skip_recorded_absences(app, make_user):
+    from conftest import admin_id, client_for
+    from exports import report_rows
+    from reports import month_range
+    user_id = make_user()
+    with app.app_context():
+        record_absences(NIGHT)
+        db.session.commit()
+        rows = list(report_rows(*month_range(DAY.year, DAY.month)))
+        assert [row[5:8] for row in rows] == [(0, 0, 0)]
+        report = {row['id']: row for row in monthly_report(DAY.year, DAY.month)}
+        assert report[user_id]['total_days'] == rows[0][5]
+
+    response = client_for(app, admin_id(app)).get('/admin/dashboard')
+    assert response.status_code == 200
+    assert b'12:00 AM' not in response.data and b'User 1' not in response.data
+
+
+def test_scripts_do_not_start_the_scheduler(tmp_path):
+    from conftest import make_config
+    from app import create_app
+    from scheduler import scheduler
+    app = create_app(make_config('sqlite:///' + str(tmp_path / 'script.db'),
+                                 SCHEDULER_ENABLED=True, TESTING=False))
+    assert app.extensions['scheduler'] is scheduler and scheduler._thread is None
+    with app.app_context():
+        db.engine.dispose()
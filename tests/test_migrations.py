@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import text
+
+from conftest import ROOT, make_config
+
+MIGRATIONS = f'{ROOT}/migrations'
+
+
+def test_index_migration_merges_duplicate_attendance(tmp_path):
+    from app import create_app, db
+    app = create_app(make_config('sqlite:///' + str(tmp_path / 'old.db'), DB_BOOTSTRAP='never'))
+    Migrate(app, db)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS, revision='de7d9677b8e6')
+        db.session.execute(text(
+            "INSERT INTO users (id, username, email, password_hash, full_name, role, is_approved) "
+            "VALUES (1, 'a', 'a@example.com', '-', 'A', 'user', 1)"))
+        insert = text("INSERT INTO attendance (user_id, date, check_in, check_out, status, working_hours, notes) "
+                      "VALUES (1, :date, :check_in, :check_out, :status, :hours, :notes)")
+        day = date(2026, 3, 2)
+        db.session.execute(insert, [
+            {'date': day, 'check_in': datetime(2026, 3, 2, 9, 40), 'check_out': None,
+             'status': 'late', 'hours': None, 'notes': 'first'},
+            {'date': day, 'check_in': datetime(2026, 3, 2, 9, 10), 'check_out': datetime(2026, 3, 2, 17, 10),
+             'status': 'present', 'hours': 8.0, 'notes': 'second'},
+        ])
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS, revision='88a6f25a9d0d')
+
+        rows = db.session.execute(text(
+            'SELECT id, check_in, check_out, status, working_hours, notes FROM attendance')).all()
+        assert len(rows) == 1
+        row = rows[0]
+        assert row.id == 1
+        assert row.check_in.startswith('2026-03-02 09:10')
+        assert row.check_out.startswith('2026-03-02 17:10')
+        assert (row.status, row.working_hours, row.notes) == ('present', 8.0, 'first second')
+        db.session.remove()
+        db.engine.dispose()
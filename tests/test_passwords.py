@@ -0,0 +1,40 @@
+from werkzeug.security import generate_password_hash
+
+from app import db, password_hasher
+from models import User
+
+
+def test_login_upgrades_outdated_hash(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.password_hash = generate_password_hash('secret1', 'pbkdf2:sha256:1000')
+        db.session.commit()
+        email = user.email
+
+    response = app.test_client().post('/login', data={'email': email, 'password': 'secret1'})
+    assert response.status_code == 302
+
+    with app.app_context():
+        stored = db.session.get(User, user_id).password_hash
+    assert not password_hasher.needs_rehash(stored)
+    assert password_hasher.verify(stored, 'secret1') == (True, None)
+
+
+def test_default_admin_is_seeded_without_hashing(app, monkeypatch):
+    import passwords
+    from bootstrap import DEFAULT_ADMIN, DEFAULT_ADMIN_PASSWORD, create_default_admin
+
+    def no_hashing(*args):
+        raise AssertionError('hashed a password at startup')
+
+    with app.app_context():
+        User.query.filter_by(email=DEFAULT_ADMIN['email']).delete()
+        db.session.commit()
+        monkeypatch.setattr(passwords, 'generate_password_hash', no_hashing)
+        assert create_default_admin()
+        monkeypatch.undo()
+
+    response = app.test_client().post('/login', data={'email': DEFAULT_ADMIN['email'],
+                                                      'password': DEFAULT_ADMIN_PASSWORD})
+    assert response.status_code == 302 and '/admin' in response.headers['Location']
@@ -0,0 +1,96 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from conftest import admin_id, client_for, make_config
+
+TODAY = date.today()
+PATHS = {
+    'admin.dashboard': (None, '/admin/dashboard'),
+    'admin.view_attendance': (None, f'/admin/attendance?date={TODAY}'),
+    'admin.attendance_report': (None, f'/admin/attendance/report?year={TODAY.year}&month={TODAY.month}'),
+    'admin.manage_leaves': (None, '/admin/leaves'),
+    'admin.manage_users': (None, '/admin/users'),
+    'user.dashboard': ('user', '/user/dashboard'),
+    'user.attendance_history': ('user', '/user/attendance-history'),
+}
+
+
+@pytest.fixture
+def budget_app(tmp_path):
+    """An app that raises QueryBudgetExceeded when an endpoint goes over
+    its QUERY_BUDGETS entry."""
+    from app import create_app, db
+    app = create_app(make_config('sqlite:///' + str(tmp_path / 'budget.db'),
+                                 QUERY_COUNT_ENABLED=True, QUERY_BUDGET_RAISE=True))
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def seed(app, users):
+    """``users`` employees in two departments, each with a week of
+    attendance (today's still open) and a pending and an approved leave."""
+    from app import db
+    from models import User, Attendance, LeaveRequest
+    with app.app_context():
+        user_ids = []
+        for n in range(users):
+            user = User(username=f'budget{n}', email=f'budget{n}@example.com', full_name=f'Budget {n}',
+                        department=('Engineering', 'Sales')[n % 2], role='user', is_approved=True,
+                        created_at=datetime(2020, 1, 1), password_hash='-')
+            db.session.add(user)
+            db.session.flush()
+            user_ids.append(user.id)
+            for days_ago in range(7):
+                day = TODAY - timedelta(days=days_ago)
+                check_in = datetime.combine(day, time(9, n % 30))
+                db.session.add(Attendance(
+                    user_id=user.id, date=day, check_in=check_in,
+                    check_out=None if days_ago == 0 else check_in + timedelta(hours=8),
+                    working_hours=0 if days_ago == 0 else 8.0, status='late' if n % 3 == 0 else 'present'))
+            for status, offset in (('pending', 10), ('approved', 20)):
+                db.session.add(LeaveRequest(user_id=user.id, leave_type='casual', reason='-', status=status,
+                                            start_date=TODAY + timedelta(days=offset),
+                                            end_date=TODAY + timedelta(days=offset + 1)))
+        db.session.commit()
+        # A user who is not approved yet, for the users page
+        db.session.add(User(username='pending', email='pending@example.com', full_name='Pending',
+                            department='Sales', role='user', is_approved=False, password_hash='-'))
+        db.session.commit()
+        return user_ids
+
+
+def query_counts(app, user_id):
+    counts = {}
+    for endpoint, (who, path) in PATHS.items():
+        response = client_for(app, user_id if who else admin_id(app)).get(path)
+        assert response.status_code == 200, endpoint
+        counts[endpoint] = int(response.headers['X-Query-Count'])
+    return counts
+
+
+def test_pages_stay_within_their_query_budgets(budget_app):
+    user_ids = seed(budget_app, users=12)
+    counts = query_counts(budget_app, user_ids[0])
+    budgets = budget_app.config['QUERY_BUDGETS']
+    assert all(counts[endpoint] <= budgets[endpoint] for endpoint in PATHS), counts
+
+
+def test_query_counts_do_not_grow_with_the_data(budget_app, tmp_path):
+    from app import create_app, db
+    small = query_counts(budget_app, seed(budget_app, users=2)[0])
+    larger = create_app(make_config('sqlite:///' + str(tmp_path / 'larger.db'),
+                                    QUERY_COUNT_ENABLED=True, QUERY_BUDGET_RAISE=True))
+    try:
+        assert query_counts(larger, seed(larger, users=20)[0]) == small
+    finally:
+        with larger.app_context():
+            db.engine.dispose()
+
+
+def test_going_over_budget_raises(budget_app):
+    from instrumentation import QueryBudgetExceeded
+    budget_app.config['QUERY_BUDGETS'] = dict(budget_app.config['QUERY_BUDGETS'], **{'admin.manage_users': 0})
+    with pytest.raises(QueryBudgetExceeded):
+        client_for(budget_app, admin_id(budget_app)).get('/admin/users')
@@ -0,0 +1,18 @@
+import pytest
+
+from conftest import admin_id, client_for
+
+
+@pytest.mark.parametrize('path', [
+    '/admin/attendance/report?year=0&month=1',
+    '/admin/attendance/report?year=10000',
+    '/admin/attendance/report/export?year=0',
+    '/admin/attendance/report/export?year=9999',
+])
+def test_out_of_range_years_are_rejected(app, path):
+    assert client_for(app, admin_id(app)).get(path).status_code == 400
+
+
+def test_last_supported_year_exports(app):
+    response = client_for(app, admin_id(app)).get('/admin/attendance/report/export?year=9998')
+    assert response.status_code == 200
@@ -0,0 +1,60 @@
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+from conftest import admin_id, client_for
+from models import Attendance, User
+
+# A function wrapped around check_in/date hides the column from its index
+NON_SARGABLE = re.compile(r'\b(date|strftime|extract|date_trunc)\s*\([^()]*\b(check_in|date)\b', re.I)
+
+
+@contextmanager
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', capture)
+
+
+def assert_sargable(statements):
+    attendance = [sql for sql in statements if 'attendance' in sql]
+    assert attendance
+    for sql in attendance:
+        assert not NON_SARGABLE.search(sql), sql
+
+
+def test_user_date_lookups_are_sargable(app, make_user):
+    user_id = make_user()
+    today = date.today()
+    with app.app_context():
+        db.session.add(Attendance(user_id=user_id, date=today, check_in=datetime.combine(today, time(9)),
+                                  status='present'))
+        db.session.commit()
+        user = db.session.get(User, user_id)
+        with captured_sql() as statements:
+            assert user.get_today_attendance() is not None
+            user.get_month_stats()
+    assert_sargable(statements)
+
+
+def test_dashboard_and_admin_views_are_sargable(app, make_user):
+    employee = client_for(app, make_user())
+    manager = client_for(app, admin_id(app))
+    yesterday = date.today() - timedelta(days=1)
+    with captured_sql() as statements:
+        assert employee.get('/user/dashboard').status_code == 200
+        assert employee.get('/user/attendance-history').status_code == 200
+        assert manager.get(f'/admin/attendance?date={yesterday.isoformat()}').status_code == 200
+        assert manager.get('/admin/api/dashboard-stats?days=30').status_code == 200
+    assert_sargable(statements)
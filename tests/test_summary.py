@@ -0,0 +1,47 @@
+from datetime import date, datetime, time, timedelta
+
+from app import db
+from models import Attendance, DailyAttendanceSummary, User
+from summary import rebuild_summary
+
+
+def rollup():
+    summary = DailyAttendanceSummary
+    return sorted((row.date, row.department, row.present_count, row.late_count, row.absent_count,
+                   round(row.total_hours, 2))
+                  for row in summary.query
+                  if row.present_count or row.late_count or row.absent_count or row.total_hours)
+
+
+def punch(user_id, day, hour, hours=8):
+    check_in = datetime.combine(day, time(hour))
+    attendance = Attendance(user_id=user_id, date=day, check_in=check_in,
+                            check_out=check_in + timedelta(hours=hours),
+                            status=Attendance.status_for(check_in))
+    attendance.calculate_hours()
+    db.session.add(attendance)
+    return attendance
+
+
+def test_rollup_follows_department_changes(context, make_user):
+    user_id, other_id = make_user('Engineering'), make_user('Engineering')
+    day = date.today() - timedelta(days=3)
+    first = punch(user_id, day, 9)
+    punch(user_id, day - timedelta(days=1), 10)
+    punch(other_id, day, 9)
+    db.session.commit()
+
+    user = db.session.get(User, user_id)
+    user.department = 'Sales'
+    first.check_out += timedelta(hours=1)
+    first.calculate_hours()
+    db.session.commit()
+
+    db.session.delete(first)
+    db.session.commit()
+
+    incremental = rollup()
+    assert all(value >= 0 for row in incremental for value in row[2:])
+    rebuild_summary()
+    db.session.commit()
+    assert incremental == rollup()
@@ -1,54 +1,14 @@
-import sqlite3
-import sys
-import io
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-conn = sqlite3.connect('attendance.db')
-conn.row_factory = sqlite3.Row
-c = conn.cursor()
-
-print("=" * 60)
-print("  ATTENDANCE TRACKER - DATABASE VIEWER")
-print("=" * 60)
+"""Quick look at the database; same as ``flask --app run inspect overview``.
 
-# Users
-print("\n[USERS]")
-print("-" * 60)
-users = c.execute('SELECT * FROM users').fetchall()
-for u in users:
-    status = "Approved" if u['is_approved'] else "Pending"
-    print(f"  ID:{u['id']} | {u['full_name']} | {u['email']} | {u['role']} | {u['department']} | {status}")
-print(f"  Total: {len(users)} users")
-
-# Attendance
-print("\n[ATTENDANCE RECORDS]")
-print("-" * 60)
-records = c.execute('''
-    SELECT a.*, u.full_name FROM attendance a 
-    JOIN users u ON a.user_id = u.id 
-    ORDER BY a.check_in DESC LIMIT 20
-''').fetchall()
-for r in records:
-    checkout = r['check_out'][:19] if r['check_out'] else 'Not yet'
-    print(f"  {r['date']} | {r['full_name']} | In: {r['check_in'][:19]} | Out: {checkout} | {r['working_hours']}h | {r['status']}")
-if not records:
-    print("  No attendance records yet.")
-print(f"  Showing: {len(records)} records")
-
-# Leave Requests
-print("\n[LEAVE REQUESTS]")
-print("-" * 60)
-leaves = c.execute('''
-    SELECT l.*, u.full_name FROM leave_requests l 
-    JOIN users u ON l.user_id = u.id 
-    ORDER BY l.created_at DESC
-''').fetchall()
-for l in leaves:
-    print(f"  {l['full_name']} | {l['leave_type']} | {l['start_date']} to {l['end_date']} | {l['status']}")
-if not leaves:
-    print("  No leave requests yet.")
-print(f"  Total: {len(leaves)} requests")
+Works against whatever ``DATABASE_URL`` points at. Extra arguments are
+passed to ``flask inspect``, e.g. ``python view_db.py attendance --user
+alice --format csv``; see ``flask --app run inspect --help``.
+"""
+import sys
+from app import create_app
+from commands import inspect_cli
 
-print("\n" + "=" * 60)
-conn.close()
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        inspect_cli.main(args=sys.argv[1:] or ['overview'], prog_name='view_db.py')
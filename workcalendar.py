@@ -0,0 +1,162 @@
+"""Working-day calendar: present / late / on-leave / absent / holiday per user.
+
+Each user's range is represented as integer bitmaps, one bit per day
+(bit 0 = ``start``). Attendance rows set bits in the present/late maps,
+approved leave sets whole runs of bits at once, and the remaining
+categories fall out of a handful of bitwise operations per user -- no
+per-day queries and no per-day Python loops.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from flask import current_app
+from app import db
+from models import User, Attendance, LeaveRequest
+
+
+def _span(first, last):
+    """Bits ``first`` up to (not including) ``last``."""
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def _count(mask):
+    return bin(mask).count('1')
+
+
+def holidays():
+    return {datetime.strptime(day, '%Y-%m-%d').date() if isinstance(day, str) else day
+            for day in current_app.config.get('HOLIDAYS', ())}
+
+
+def working_mask(start, end):
+    """Bitmap of the working days in [start, end)."""
+    weekdays = set(current_app.config.get('WORK_WEEKDAYS', (0, 1, 2, 3, 4)))
+    days = (end - start).days
+    week = 0
+    for offset in range(7):
+        if (start.weekday() + offset) % 7 in weekdays:
+            week |= 1 << offset
+    # Tile the first week across the range, then trim
+    mask = 0
+    for block in range(0, days, 7):
+        mask |= week << block
+    mask &= _span(0, days)
+    for holiday in holidays():
+        if start <= holiday < end:
+            mask &= ~(1 << (holiday - start).days)
+    return mask
+
+
+def leave_intervals(start, end, user_ids=None):
+    """Approved leave overlapping [start, end).
+
+    Served by the (user_id, start_date, end_date, status) index.
+    """
+    query = db.session.query(LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date)\
+        .filter(LeaveRequest.status == 'approved',
+                LeaveRequest.start_date < end,
+                LeaveRequest.end_date >= start)
+    if user_ids is not None:
+        query = query.filter(LeaveRequest.user_id.in_(user_ids))
+    return query
+
+
+WORD_BITS = 62
+
+
+def day_offset(start, column=Attendance.date):
+    """SQL expression for ``column - start`` in days, if supported."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return db.cast(db.func.julianday(column) - db.func.julianday(start.isoformat()),
+                       db.Integer)
+    if dialect == 'postgresql':
+        return column - start
+    return None
+
+
+def attendance_bitmaps(start, end, user_ids=None):
+    """Yield ``(user_id, kind, mask)`` day bitmaps for [start, end).
+
+    ``kind`` is 'present', 'late' or 'absent'. Where the dialect can do date
+    arithmetic, the bitmaps are built by the database itself: each row
+    contributes ``1 << (offset % 62)`` to a 62-day word summed per
+    (user, word, kind), so a year of attendance comes back as a handful of
+    integers per user instead of one row per day.
+    """
+    from archive import attendance_entity
+    attendance = attendance_entity(start, end, user_ids)
+    kind = db.case((attendance.status == 'late', 'late'),
+                   (attendance.status == 'absent', 'absent'),
+                   else_='present')
+    offset = day_offset(start, attendance.date)
+    if offset is None:
+        rows = db.session.query(attendance.user_id, kind, attendance.date)
+    else:
+        word = offset // WORD_BITS
+        bits = db.func.sum(db.literal(1, db.BigInteger).op('<<')(offset % WORD_BITS))
+        rows = db.session.query(attendance.user_id, kind, word, bits)
+    rows = rows.filter(attendance.date >= start, attendance.date < end)
+    if user_ids is not None:
+        rows = rows.filter(attendance.user_id.in_(user_ids))
+
+    if offset is None:
+        base = start.toordinal()
+        for user_id, row_kind, day in rows.execution_options(yield_per=5000):
+            yield user_id, row_kind, 1 << (day.toordinal() - base)
+        return
+
+    for user_id, row_kind, word_index, mask in rows.group_by(attendance.user_id, kind, word):
+        yield user_id, row_kind, int(mask) << (int(word_index) * WORD_BITS)
+
+
+def calendar_stats(start, end, user_ids=None, today=None):
+    """Day counts per user for [start, end).
+
+    Returns ``{user_id: {'present_days', 'late_days', 'on_leave_days',
+    'absent_days', 'holidays', 'working_days'}}`` for approved employees
+    (or just ``user_ids``). Days before an employee joined and days from
+    ``today`` onwards are never counted as absent.
+    """
+    today = today or date.today()
+    days = (end - start).days
+    base = start.toordinal()
+    working = working_mask(start, end)
+    past = _span(0, min(days, max(0, (today - start).days)))
+    whole = _span(0, days)
+
+    users = db.session.query(User.id, User.created_at)
+    if user_ids is not None:
+        users = users.filter(User.id.in_(user_ids))
+    else:
+        users = users.filter(User.role == 'user', User.is_approved == True)
+    users = users.all()
+
+    maps = {'present': defaultdict(int), 'late': defaultdict(int), 'absent': defaultdict(int)}
+    for user_id, kind, mask in attendance_bitmaps(start, end, user_ids):
+        maps[kind][user_id] |= mask
+    present, late, marked_absent = maps['present'], maps['late'], maps['absent']
+
+    leave = defaultdict(int)
+    for user_id, first, last in leave_intervals(start, end, user_ids):
+        leave[user_id] |= _span(max(first.toordinal(), base) - base,
+                                min(last.toordinal() + 1, base + days) - base)
+
+    result = {}
+    for user_id, created_at in users:
+        joined = whole
+        if created_at is not None and created_at.date() > start:
+            joined = _span((created_at.date() - start).days, days)
+        attended = present[user_id] | late[user_id]
+        expected = working & joined
+        result[user_id] = {
+            'present_days': _count(present[user_id]),
+            'late_days': _count(late[user_id]),
+            'on_leave_days': _count(leave[user_id] & expected & ~attended),
+            'absent_days': _count((expected & past & ~attended & ~leave[user_id])
+                                  | marked_absent[user_id]),
+            'holidays': _count(whole & ~working),
+            'working_days': _count(expected),
+        }
+    return result
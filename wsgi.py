@@ -1,6 +1,6 @@
 from app import create_app
 
-app = create_app()
+app = create_app(start_scheduler=True)
 
 # Vercel needs this as the entry point
 app = app